@@ -1,13 +1,10 @@
-
-from flask import Flask, render_template, request, jsonify, send_from_directory, send_file
 import os
-import zipfile
-import io
 import sys
-from werkzeug.utils import secure_filename
+import time
+import queue
 import logging
-import mammoth
-from docx import Document
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # 1. Setup logging FIRST
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +19,21 @@ if root_dir not in sys.path:
 
 logger.info(f"Startup - root_dir: {root_dir}")
 
-# 3. Initialize Flask with ABSOLUTE paths for templates and static
+# 3. Import Flask (timed); pandas, python-docx, mammoth and the report modules
+# are imported lazily on first use, see lazy_imports.py
+import lazy_imports
+import preview_cache
+import zip_cache
+import upload_cache
+import workspace
+import metrics
+import jobs
+with lazy_imports.timed('flask'):
+    from flask import Flask, Response, g, render_template, request, jsonify, send_from_directory, send_file
+    from werkzeug.utils import secure_filename
+    import profiling
+
+# 4. Initialize Flask with ABSOLUTE paths for templates and static
 template_dir = os.path.join(root_dir, 'templates')
 static_dir = os.path.join(root_dir, 'static')
 
@@ -36,27 +47,31 @@ app = Flask(__name__,
             template_folder=template_dir, 
             static_folder=static_dir)
 
-# 4. Import report modules with error handling
-try:
-    from report_grade_10 import generate_grade_10_reports
-    from report_grade_11 import generate_grade_11_reports
-    logger.info("Successfully imported report modules")
-except Exception as e:
-    logger.error(f"FAILED to import report modules: {e}")
-    def generate_grade_10_reports(*args, **kwargs): raise e
-    def generate_grade_11_reports(*args, **kwargs): raise e
-
-# 5. App configuration
+# 5. Report modules are loaded on the first generation request and kept warm
+def generate_grade_10_reports(*args, **kwargs):
+    report_grade_10, _ = lazy_imports.load_report_modules()
+    return report_grade_10.generate_grade_10_reports(*args, **kwargs)
+
+def generate_grade_11_reports(*args, **kwargs):
+    _, report_grade_11 = lazy_imports.load_report_modules()
+    return report_grade_11.generate_grade_11_reports(*args, **kwargs)
+
+def load_feedback_by_class(timesheet_path, class_names):
+    lazy_imports.load_report_modules()
+    return lazy_imports.load('timesheet').load_feedback_by_class(timesheet_path, class_names)
+
+# 6. App configuration
 if os.environ.get('VERCEL'):
     BASE_TEMP = '/tmp'
 else:
     BASE_TEMP = root_dir
 
-app.config['UPLOAD_FOLDER'] = os.path.join(BASE_TEMP, 'uploads')
+# Each generation run saves its uploads and renders its reports in its own workspace
+app.config['WORKSPACE_DIR'] = os.path.join(BASE_TEMP, 'workspaces')
 app.config['GRADE_10_DIR'] = os.path.join(BASE_TEMP, 'Grade_10')
 app.config['GRADE_11_DIR'] = os.path.join(BASE_TEMP, 'Grade_11')
 
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+os.makedirs(app.config['WORKSPACE_DIR'], exist_ok=True)
 os.makedirs(app.config['GRADE_10_DIR'], exist_ok=True)
 os.makedirs(app.config['GRADE_11_DIR'], exist_ok=True)
 
@@ -74,6 +89,30 @@ def clean_nans(value):
         return [clean_nans(v) for v in value]
     return value
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    # Streamed bodies (SSE, ZIP) are still being sent at this point; only the setup is timed
+    started = g.get('request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route, status=response.status_code)
+    return response
+
+@app.route('/debug/profiles/<name>')
+def download_profile(name):
+    # Same guard as taking a profile: PCT_PROFILING on and, if configured, the token
+    if not profiling.requested():
+        return jsonify({'success': False, 'message': 'Không tìm thấy'}), 404
+    return send_from_directory(profiling.PROFILE_DIR, name, as_attachment=True)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -86,118 +125,313 @@ def debug():
         'template_dir': template_dir,
         'template_exists': os.path.exists(template_dir),
         'root_files': os.listdir(root_dir) if os.path.exists(root_dir) else "not found",
-        'vercel_env': os.environ.get('VERCEL', 'False')
+        'vercel_env': os.environ.get('VERCEL', 'False'),
+        'startup': lazy_imports.startup_report(),
+        'preview_cache': preview_cache.stats(),
+        'upload_cache': upload_cache.stats()
     })
 
-@app.route('/generate', methods=['POST'])
-def generate():
+def parse_generate_form():
+    """Validates the /generate form and saves the uploads. Returns (params, error_message)."""
+    # Get Grade 10 inputs
     try:
-        # Get Grade 10 inputs
-        try:
-            week_10 = int(request.form['week_10'])
-            ielts_10 = int(request.form['ielts_10'])
-            vstep_10 = int(request.form['vstep_10'])
-            file_10 = request.files['file_10']
-            
-            # New config inputs for Grade 10
-            course_vstep_10 = request.form.get('course_vstep_10', "Practical English A2-B2")
-            course_ielts_10 = request.form.get('course_ielts_10', "Practical English A1")
-            classes_10_str = request.form.get('classes_10', "10E1, 10E2, 10E3, 10E4")
-            target_classes_10 = [cls.strip() for cls in classes_10_str.split(',') if cls.strip()]
-
-        except (ValueError, KeyError) as e:
-            return jsonify({'success': False, 'message': f'Lỗi dữ liệu đầu vào Khối 10: {str(e)}'})
-
-        # Get Grade 11 inputs
-        try:
-            week_11 = int(request.form['week_11'])
-            ielts_11 = int(request.form['ielts_11'])
-            vstep_11 = int(request.form['vstep_11'])
-            file_11 = request.files['file_11']
-
-            # New config inputs for Grade 11
-            course_vstep_11 = request.form.get('course_vstep_11', "Practical English A2-B2")
-            course_ielts_11 = request.form.get('course_ielts_11', "Practical English B2 & IELTS A2-B1")
-            classes_11_str = request.form.get('classes_11', "11E1, 11E2, 11E3, 11E4, 11V1, 11V2, 11V3, 11V4, 11V5, 11V6")
-            target_classes_11 = [cls.strip() for cls in classes_11_str.split(',') if cls.strip()]
-
-        except (ValueError, KeyError) as e:
-            return jsonify({'success': False, 'message': f'Lỗi dữ liệu đầu vào Khối 11: {str(e)}'})
-
-        # Check if files are provided
-        timesheet_file = request.files.get('timesheet_file')
-        if not file_10 or not file_11 or not timesheet_file:
-            return jsonify({'success': False, 'message': 'Vui lòng cung cấp cả 3 file dữ liệu (Grade 10, 11 và Timesheet).'})
-
-        # Save uploaded files
-        path_10 = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(file_10.filename))
-        path_11 = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(file_11.filename))
-        path_timesheet = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(timesheet_file.filename))
+        week_10 = int(request.form['week_10'])
+        ielts_10 = int(request.form['ielts_10'])
+        vstep_10 = int(request.form['vstep_10'])
+        file_10 = request.files['file_10']
         
-        file_10.save(path_10)
-        file_11.save(path_11)
-        timesheet_file.save(path_timesheet)
+        # New config inputs for Grade 10
+        course_vstep_10 = request.form.get('course_vstep_10', "Practical English A2-B2")
+        course_ielts_10 = request.form.get('course_ielts_10', "Practical English A1")
+        classes_10_str = request.form.get('classes_10', "10E1, 10E2, 10E3, 10E4")
+        target_classes_10 = [cls.strip() for cls in classes_10_str.split(',') if cls.strip()]
 
+    except (ValueError, KeyError) as e:
+        return None, f'Lỗi dữ liệu đầu vào Khối 10: {str(e)}'
+
+    # Get Grade 11 inputs
+    try:
+        week_11 = int(request.form['week_11'])
+        ielts_11 = int(request.form['ielts_11'])
+        vstep_11 = int(request.form['vstep_11'])
+        file_11 = request.files['file_11']
+
+        # New config inputs for Grade 11
+        course_vstep_11 = request.form.get('course_vstep_11', "Practical English A2-B2")
+        course_ielts_11 = request.form.get('course_ielts_11', "Practical English B2 & IELTS A2-B1")
+        classes_11_str = request.form.get('classes_11', "11E1, 11E2, 11E3, 11E4, 11V1, 11V2, 11V3, 11V4, 11V5, 11V6")
+        target_classes_11 = [cls.strip() for cls in classes_11_str.split(',') if cls.strip()]
+
+    except (ValueError, KeyError) as e:
+        return None, f'Lỗi dữ liệu đầu vào Khối 11: {str(e)}'
+
+    # Check if files are provided
+    timesheet_file = request.files.get('timesheet_file')
+    if not file_10 or not file_11 or not timesheet_file:
+        return None, 'Vui lòng cung cấp cả 3 file dữ liệu (Grade 10, 11 và Timesheet).'
+
+    # Save uploaded files into this run's workspace, so concurrent requests never share paths
+    run_workspace = workspace.create(app.config['WORKSPACE_DIR'], [app.config['GRADE_10_DIR'], app.config['GRADE_11_DIR']])
+    path_10 = run_workspace.upload_path('file_10', secure_filename(file_10.filename))
+    path_11 = run_workspace.upload_path('file_11', secure_filename(file_11.filename))
+    path_timesheet = run_workspace.upload_path('timesheet_file', secure_filename(timesheet_file.filename))
+    
+    # Hashed while saving, so re-submitted files are recognised by the upload cache
+    upload_cache.save_upload(file_10, path_10)
+    upload_cache.save_upload(file_11, path_11)
+    upload_cache.save_upload(timesheet_file, path_timesheet)
+
+    params = {
+        'workspace': run_workspace,
+        'week_10': week_10, 'ielts_10': ielts_10, 'vstep_10': vstep_10, 'path_10': path_10,
+        'course_vstep_10': course_vstep_10, 'course_ielts_10': course_ielts_10, 'target_classes_10': target_classes_10,
+        'week_11': week_11, 'ielts_11': ielts_11, 'vstep_11': vstep_11, 'path_11': path_11,
+        'course_vstep_11': course_vstep_11, 'course_ielts_11': course_ielts_11, 'target_classes_11': target_classes_11,
+        'path_timesheet': path_timesheet,
         # Get lesson totals
-        total_ielts_10 = int(request.form.get('total_ielts_10', 32))
-        total_vstep_10 = int(request.form.get('total_vstep_10', 57))
-        total_ielts_11 = int(request.form.get('total_ielts_11', 54))
-        total_vstep_11 = int(request.form.get('total_vstep_11', 52))
+        'total_ielts_10': int(request.form.get('total_ielts_10', 32)),
+        'total_vstep_10': int(request.form.get('total_vstep_10', 57)),
+        'total_ielts_11': int(request.form.get('total_ielts_11', 54)),
+        'total_vstep_11': int(request.form.get('total_vstep_11', 52)),
+        # Render engine for this run ('docx' or 'xml'); empty falls back to PCT_RENDER_ENGINE
+        'render_engine': request.form.get('render_engine') or None,
+        # Include a per-stage timing breakdown (ms) in the response
+        'timings': bool(request.values.get('timings')),
+        # Re-render every class even if its inputs are unchanged since the last run
+        'incremental': False if request.form.get('force_regenerate') else None,
+    }
+    return params, None
+
+def run_generation(params, progress=None):
+    """
+    Runs both grade pipelines and returns the /generate JSON payload.
+    progress(group, event, **fields), if given, receives the generators' progress events;
+    group is 'Grade_10', 'Grade_11' or 'shared' (the timesheet step).
+    """
+    started = time.perf_counter()
+    timings = {}
+    try:
+        result = generate_in_workspace(params, params['workspace'], progress, timings)
+    finally:
+        # The parsed uploads stay in upload_cache; the files themselves are no longer needed
+        params['workspace'].discard_uploads()
+    if params.get('timings'):
+        result['timings'] = dict(timings, total_ms=round((time.perf_counter() - started) * 1000, 1))
+    return result
+
+def publish_week(staging_dir, published_dir, generated):
+    """Publishes a grade's finished week directory and returns the reports' public paths."""
+    workspace.publish(staging_dir, published_dir)
+    return [os.path.join(published_dir, os.path.basename(p)) for p in generated]
+
+def generate_in_workspace(params, run_workspace, progress=None, timings=None):
+    """Body of run_generation; stage durations (ms) are added to timings[group][stage]."""
+    if timings is None:
+        timings = {}
+
+    def record_timing(group):
+        def on_span(stage, seconds):
+            stages = timings.setdefault(group, {})
+            stages[stage] = round(stages.get(stage, 0) + seconds * 1000, 1)
+        return on_span
+
+    def observer(group):
+        on_span = record_timing(group)
+
+        def observe(event, **fields):
+            if event == 'timing':
+                on_span(fields['stage'], fields['seconds'])
+            if progress is not None:
+                progress(group, event, **fields)
+        return observe
+
+    # Generate Reports
+    generated_10 = []
+    generated_11 = []
+    stats_10 = None
+    stats_11 = None
+
+    # Reports are rendered into the workspace and published once the grade has finished
+    published_dir_10 = os.path.join(app.config['GRADE_10_DIR'], f"Grade_10_Week {params['week_10']}")
+    published_dir_11 = os.path.join(app.config['GRADE_11_DIR'], f"Grade_11_Week {params['week_11']}")
+    with metrics.span('shared', 'stage_outputs', record_timing('shared')):
+        out_dir_10 = run_workspace.stage(published_dir_10)
+        out_dir_11 = run_workspace.stage(published_dir_11)
+
+    # Parse the timesheet once; both grades read their classes' comments from it
+    if progress is not None:
+        progress('shared', 'stage', stage='timesheet')
+    try:
+        with metrics.span('shared', 'timesheet', record_timing('shared')):
+            feedback_by_class = load_feedback_by_class(params['path_timesheet'], params['target_classes_10'] + params['target_classes_11'])
+    except Exception as e:
+        logger.error(f"Error reading timesheet: {e}")
+        return {'success': False, 'message': f'Lỗi đọc file Timesheet: {str(e)}'}
+    if progress is not None:
+        progress('shared', 'stage', stage='timesheet', status='done')
+
+    # The two grades only share the timesheet, so run both pipelines concurrently
+    # (in this thread when the request is being profiled, so the profile covers them)
+    with (profiling.InlineExecutor() if profiling.active() else ThreadPoolExecutor(max_workers=2)) as pool:
+        future_10 = pool.submit(
+            generate_grade_10_reports,
+            params['week_10'], params['vstep_10'], params['ielts_10'], params['path_10'], output_dir=out_dir_10,
+            target_classes_list=params['target_classes_10'],
+            course_vstep=params['course_vstep_10'],
+            course_ielts=params['course_ielts_10'],
+            total_ielts=params['total_ielts_10'],
+            total_vstep=params['total_vstep_10'],
+            timesheet_path=params['path_timesheet'],
+            feedback_by_class=feedback_by_class,
+            engine=params['render_engine'],
+            incremental=params['incremental'],
+            progress=observer('Grade_10')
+        )
+        future_11 = pool.submit(
+            generate_grade_11_reports,
+            params['week_11'], params['vstep_11'], params['ielts_11'], params['path_11'], output_dir=out_dir_11,
+            target_classes_list=params['target_classes_11'],
+            course_vstep=params['course_vstep_11'],
+            course_ielts=params['course_ielts_11'],
+            total_ielts=params['total_ielts_11'],
+            total_vstep=params['total_vstep_11'],
+            timesheet_path=params['path_timesheet'],
+            feedback_by_class=feedback_by_class,
+            engine=params['render_engine'],
+            incremental=params['incremental'],
+            progress=observer('Grade_11')
+        )
+
+    errors = {}
+    try:
+        generated_10, stats_10 = future_10.result()
+        with metrics.span('Grade_10', 'publish', record_timing('Grade_10')):
+            generated_10 = publish_week(out_dir_10, published_dir_10, generated_10)
+    except Exception as e:
+        logger.error(f"Error generating Grade 10: {e}")
+        errors['error_10'] = f'Lỗi tạo báo cáo Khối 10: {str(e)}'
 
-        # Generate Reports
-        generated_10 = []
-        generated_11 = []
-        stats_10 = None
-        stats_11 = None
+    try:
+        generated_11, stats_11 = future_11.result()
+        with metrics.span('Grade_11', 'publish', record_timing('Grade_11')):
+            generated_11 = publish_week(out_dir_11, published_dir_11, generated_11)
+    except Exception as e:
+        logger.error(f"Error generating Grade 11: {e}")
+        errors['error_11'] = f'Lỗi tạo báo cáo Khối 11: {str(e)}'
+
+    if errors:
+        return {'success': False, 'message': '\n'.join(errors.values()), **errors}
+
+    # Optionally render previews in the background so the first click is a cache hit
+    preview_cache.prerender(generated_10 + generated_11)
+
+    return {
+        'success': True, 
+        'message': f'Đã tạo thành công {len(generated_10) + len(generated_11)} báo cáo.',
+        'reports_10': [os.path.basename(p) for p in generated_10],
+        'reports_11': [os.path.basename(p) for p in generated_11],
+        'week_10': params['week_10'],
+        'week_11': params['week_11'],
+        'reused_10': (stats_10 or {}).get('reused_reports', []),
+        'reused_11': (stats_11 or {}).get('reused_reports', []),
+        'stats_10': clean_nans(stats_10),
+        'stats_11': clean_nans(stats_11)
+    }
 
-        try:
-            out_dir_10 = os.path.join(app.config['GRADE_10_DIR'], f'Grade_10_Week {week_10}')
-            generated_10, stats_10 = generate_grade_10_reports(
-                week_10, vstep_10, ielts_10, path_10, output_dir=out_dir_10,
-                target_classes_list=target_classes_10,
-                course_vstep=course_vstep_10,
-                course_ielts=course_ielts_10,
-                total_ielts=total_ielts_10,
-                total_vstep=total_vstep_10,
-                timesheet_path=path_timesheet
-            )
-        except Exception as e:
-            logger.error(f"Error generating Grade 10: {e}")
-            return jsonify({'success': False, 'message': f'Lỗi tạo báo cáo Khối 10: {str(e)}'})
+@app.route('/generate', methods=['POST'])
+@profiling.profiled
+def generate():
+    try:
+        params, error = parse_generate_form()
+        if error:
+            return jsonify({'success': False, 'message': error})
+
+        return jsonify(run_generation(params))
+
+    except Exception as e:
+        logger.error(f"General Error: {e}")
+        return jsonify({'success': False, 'message': f'Lỗi hệ thống: {str(e)}'})
 
+@app.route('/generate/stream', methods=['POST'])
+def generate_stream():
+    """
+    Streaming /generate (server-sent events): 'stats' as soon as a grade's stats are
+    computed, 'report' as each class report is written, then 'done' with the usual
+    /generate JSON. 'stage' and 'report_failed' events carry progress and per-class errors.
+    """
+    try:
+        params, error = parse_generate_form()
+    except Exception as e:
+        logger.error(f"General Error: {e}")
+        params, error = None, f'Lỗi hệ thống: {str(e)}'
+
+    events = queue.Queue()
+    weeks = {'Grade_10': params['week_10'], 'Grade_11': params['week_11']} if params else {}
+
+    def progress(group, event, **fields):
+        if event == 'stage':
+            events.put(('stage', {'grade': group, **fields}))
+        elif event == 'stats':
+            events.put(('stats', {'grade': group, 'stats': clean_nans(fields['stats'])}))
+        elif event == 'class' and fields.get('file'):
+            events.put(('report', {'grade': group, 'week': weeks[group], 'filename': fields['file'], 'reused': fields.get('reused', False)}))
+        elif event == 'class':
+            events.put(('report_failed', {'grade': group, 'className': fields['className'], 'error': fields.get('error')}))
+
+    def worker():
         try:
-            out_dir_11 = os.path.join(app.config['GRADE_11_DIR'], f'Grade_11_Week {week_11}')
-            generated_11, stats_11 = generate_grade_11_reports(
-                week_11, vstep_11, ielts_11, path_11, output_dir=out_dir_11,
-                target_classes_list=target_classes_11,
-                course_vstep=course_vstep_11,
-                course_ielts=course_ielts_11,
-                total_ielts=total_ielts_11,
-                total_vstep=total_vstep_11,
-                timesheet_path=path_timesheet
-            )
+            result = run_generation(params, progress=progress)
         except Exception as e:
-            logger.error(f"Error generating Grade 11: {e}")
-            return jsonify({'success': False, 'message': f'Lỗi tạo báo cáo Khối 11: {str(e)}'})
-
-        response_data = {
-            'success': True, 
-            'message': f'Đã tạo thành công {len(generated_10) + len(generated_11)} báo cáo.',
-            'reports_10': [os.path.basename(p) for p in generated_10],
-            'reports_11': [os.path.basename(p) for p in generated_11],
-            'week_10': week_10,
-            'week_11': week_11,
-            'stats_10': clean_nans(stats_10),
-            'stats_11': clean_nans(stats_11)
-        }
-        
-        return jsonify(response_data)
+            logger.error(f"General Error: {e}")
+            result = {'success': False, 'message': f'Lỗi hệ thống: {str(e)}'}
+        events.put(('done', result))
+
+    if error:
+        events.put(('done', {'success': False, 'message': error}))
+    else:
+        threading.Thread(target=worker, daemon=True).start()
+
+    def stream():
+        while True:
+            try:
+                event, data = events.get(timeout=15)
+            except queue.Empty:
+                # Comment line keeps proxies from closing an idle connection
+                yield ': keep-alive\n\n'
+                continue
+            yield f'event: {event}\ndata: {app.json.dumps(data)}\n\n'
+            if event == 'done':
+                return
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/generate/jobs', methods=['POST'])
+def submit_generate_job():
+    """Asynchronous /generate: returns a job id at once, the result comes from the status route."""
+    if not jobs.enabled():
+        return jsonify({'success': False, 'async': False, 'message': 'Chế độ xử lý nền không khả dụng.'}), 503
+    try:
+        params, error = parse_generate_form()
+        if error:
+            return jsonify({'success': False, 'message': error})
+
+        job = jobs.submit(lambda job: run_generation(params, progress=job.progress))
+        return jsonify({'success': True, 'jobId': job.id, 'statusUrl': f'/generate/jobs/{job.id}'}), 202
 
     except Exception as e:
         logger.error(f"General Error: {e}")
         return jsonify({'success': False, 'message': f'Lỗi hệ thống: {str(e)}'})
 
+@app.route('/generate/jobs/<job_id>')
+def generate_job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Không tìm thấy tác vụ'}), 404
+    return jsonify(job.to_dict())
+
 @app.route('/preview/<grade>/<week>/<filename>')
+@profiling.profiled
 def preview_report(grade, week, filename):
     week_dir = f"{grade}_Week {week}"
     if grade == 'Grade_10':
@@ -211,9 +445,7 @@ def preview_report(grade, week, filename):
         return "File không tồn tại", 404
     
     try:
-        with open(file_path, "rb") as docx_file:
-            result = mammoth.convert_to_html(docx_file)
-            return result.value
+        return preview_cache.get_html(file_path)
     except Exception as e:
         logger.error(f"Mammoth error: {e}")
         return f"Lỗi hiển thị nội dung: {str(e)}", 500
@@ -230,6 +462,7 @@ def download_file(grade, week, filename):
     return send_from_directory(directory, filename, as_attachment=True)
 
 @app.route('/download-zip/<grade>/<week>')
+@profiling.profiled
 def download_zip(grade, week):
     week_dir_name = f"{grade}_Week {week}"
     if grade == 'Grade_10':
@@ -242,15 +475,17 @@ def download_zip(grade, week):
     if not os.path.exists(target_dir):
         return jsonify({'success': False, 'message': 'Thư mục không tồn tại'})
 
-    # Create Zip
-    memory_file = io.BytesIO()
-    with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
-        for root, dirs, files in os.walk(target_dir):
-            for file in files:
-                zf.write(os.path.join(root, file), file)
-    
-    memory_file.seek(0)
-    return send_file(memory_file, download_name=f'{week_dir_name}.zip', as_attachment=True)
+    # Serve the cached archive if no report changed since it was built, else stream a new one
+    archive = zip_cache.cached_archive(target_dir)
+    if archive:
+        return send_file(archive, download_name=f'{week_dir_name}.zip', as_attachment=True)
+
+    response = Response(zip_cache.stream_archive(target_dir), mimetype='application/zip')
+    response.headers.set('Content-Disposition', 'attachment', filename=f'{week_dir_name}.zip')
+    return response
+
+lazy_imports.mark('app_ready')
+logger.info(f"Startup report: {lazy_imports.startup_report()}")
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
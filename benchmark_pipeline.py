@@ -0,0 +1,280 @@
+"""
+Times each stage of the report pipeline on synthetic data.
+
+    python benchmark_pipeline.py [--preset small|medium|large] [--students N] [--classes N]
+                                 [--comments N] [--grade 10|11] [--repeat N] [--engine docx|xml]
+                                 [--output results.json] [--data-dir DIR]
+
+Writes a roster, a platform export and a teacher timesheet shaped like StudentList10.xlsx,
+Data/Grade_10_data.xlsx and the timesheet, then runs load, clean_data,
+add_contribute_to_dataframe, get_processed_feedback, calculate_stats, the per-class
+partitioning, create_report and the template save on them. Everything runs offline.
+The results are one JSON document (stdout, or --output), so runs on different commits
+can be compared stage by stage.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import contextlib
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timedelta
+import pandas as pd
+
+import analysis
+import export_reader
+import report_render
+import timesheet
+import upload_cache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PRESETS = {
+    'small': {'students': 1000, 'classes': 4, 'comments': 0},
+    'medium': {'students': 10000, 'classes': 40, 'comments': 1000},
+    'large': {'students': 100000, 'classes': 200, 'comments': 10000},
+}
+
+STAGES = ['load', 'clean_data', 'add_contribute', 'get_processed_feedback', 'calculate_stats',
+          'partition', 'create_report', 'save']
+
+EXPORT_STATUSES = ['Far Ahead', 'Ahead', 'On Track', 'Behind', 'Far Behind', 'Removed']
+TEACHERS = ['Vĩ Văn', 'Kim Ngân', 'Trúc Quỳnh', 'Văn Trí', 'Hương', 'Linh', 'Minh Quang', 'Xuân Lộc']
+COMMENTS = [
+    'Lớp trật tự, tham gia bài tốt, nhiệt tình tương tác với giáo viên.',
+    'Lớp có mặt đầy đủ, một số bạn chưa tập trung, giáo viên đã nhắc nhở tại lớp.',
+    'Các bạn làm bài reading theo hướng dẫn khá tốt, cần luyện thêm phần speaking.',
+]
+
+
+def class_names(grade, count, kinds):
+    """
+    count English classes cycling through kinds ('E' for IELTS, 'V' for VSTEP), e.g. 11E1, 11V1, 11E2...
+    kinds come from the grade's default class list: Grade 10 only runs IELTS classes.
+    """
+    return [f'{grade}{kinds[index % len(kinds)]}{index // len(kinds) + 1}' for index in range(count)]
+
+
+def make_roster(grade, students, classes, rng):
+    rows = []
+    for index in range(students):
+        english_class = classes[index % len(classes)]
+        family, given = f'NGUYỄN VĂN {index // 26}', chr(ord('A') + index % 26)
+        rows.append({
+            'User ID': f'student{index:06d}@example.com',
+            'Family Name (Local)': family,
+            'Given Name (Local)': given,
+            'Full Name': f'{family.title()} {given}',
+            'Main Class': f'{grade}A{rng.randint(1, 12)}',
+            'English Class': english_class,
+            'Type': 'IELTS' if english_class[len(str(grade))] == 'E' else 'VSTEP',
+        })
+    return pd.DataFrame(rows)
+
+
+def make_export(grade, roster, rng):
+    rows = []
+    for user_id, main_class in zip(roster['User ID'], roster['Main Class']):
+        passed = rng.randint(0, 30)
+        studied = passed + rng.randint(0, 10)
+        rows.append({
+            'User ID': user_id,
+            'Family Name': '', 'Given Name': '', 'Family Name (Local)': '', 'Given Name (Local)': '',
+            'Phone': rng.randint(900000000, 999999999),
+            'Main Class': main_class,
+            'English Class': None,
+            'Program Name': f'PCT 2025-2026 Grade {grade} S2',
+            'Course Name': 'Practical English A2',
+            'Access Start': '2026-01-14', 'Access End': '2026-03-20',
+            'Status': rng.choices(EXPORT_STATUSES, weights=[10, 20, 30, 25, 12, 3])[0],
+            'Progress': f'{rng.randint(0, 100)}%',
+            'First Accessed At': '2026-01-16 22:16 +07:00', 'Last Accessed At': '2026-02-01 13:52 +07:00',
+            'Sign-ins': float(rng.randint(0, 40)),
+            'Study Time': f'{rng.randint(0, 20)}:{rng.randint(0, 59):02d}',
+            'Passed at': None,
+            'Units(lessons) Passed': passed,
+            'Units(lessons) Studied': studied,
+        })
+    return pd.DataFrame(rows)
+
+
+def make_timesheet(classes, comments, rng, now):
+    start, end = timesheet.feedback_window(now)
+    days = max((end - start).days, 1)
+    rows = []
+    for index in range(comments):
+        # Midnight of a day inside the window (the window starts mid-day)
+        date = start + timedelta(days=rng.randint(1, days))
+        rows.append({
+            'Timestamp': date + timedelta(hours=12),
+            'Email Address': None,
+            'Your name': rng.choice(TEACHERS),
+            'Date': date.replace(hour=0, minute=0, second=0, microsecond=0),
+            'Period': '1,2 (7:15 - 8:50)',
+            'Class (old)': None,
+            'Class': classes[index % len(classes)],
+            'Comments': rng.choice(COMMENTS),
+        })
+    columns = ['Timestamp', 'Email Address', 'Your name', 'Date', 'Period', 'Class (old)', 'Class', 'Comments']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def write_dataset(data_dir, grade, students, classes, comments, kinds, seed=0, now=None):
+    """Writes the three synthetic workbooks and returns their paths and class names."""
+    rng = random.Random(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    names = class_names(grade, classes, kinds)
+    roster = make_roster(grade, students, names, rng)
+    paths = {
+        'roster': os.path.join(data_dir, f'StudentList{grade}.xlsx'),
+        'export': os.path.join(data_dir, f'Grade_{grade}_data.xlsx'),
+        'timesheet': os.path.join(data_dir, 'PCT Teacher Timesheet (Responses).xlsx'),
+    }
+    roster.to_excel(paths['roster'], index=False)
+    make_export(grade, roster, rng).to_excel(paths['export'], index=False)
+    make_timesheet(names, comments, rng, now).to_excel(paths['timesheet'], index=False)
+    return paths, names
+
+
+class StageTimer:
+    def __init__(self):
+        self.seconds = {stage: 0.0 for stage in STAGES}
+
+    def time(self, stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.seconds[stage] += time.perf_counter() - start
+
+
+def run_once(module, paths, classes, out_dir, engine, current_week=21, vstep_lesson_num=20, ielts_lesson_num=18):
+    timer = StageTimer()
+    # get_processed_feedback would otherwise be served from the previous repeat's parse
+    upload_cache.clear()
+
+    roster = pd.read_excel(paths['roster'])
+    excel_file = timer.time('load', export_reader.read_platform_export, paths['export'])
+    data = timer.time('clean_data', module.clean_data, excel_file, roster)
+    timer.time('add_contribute', module.add_contribute_to_dataframe, data, ielts_lesson_num, vstep_lesson_num)
+    feedback = timer.time('get_processed_feedback', module.get_processed_feedback, classes, feedback_path=paths['timesheet'])
+    timer.time('calculate_stats', analysis.calculate_stats, data)
+
+    def partition():
+        partitions = module.partition_by_class(data)
+        feedback_by_class = timesheet.partition_by_class(feedback, classes)
+        slices = {}
+        for class_name in classes:
+            class_slices = dict(partitions.get(class_name) or module.empty_class_slices(data))
+            class_slices['feedback'] = feedback_by_class[class_name]
+            slices[class_name] = class_slices
+        return slices
+
+    slices_by_class = timer.time('partition', partition)
+
+    # create_report ends in report_render.render (template fill + write); that part is timed as 'save'
+    render = report_render.render
+
+    def timed_render(*args, **kwargs):
+        return timer.time('save', render, *args, **kwargs)
+
+    report_render.render = timed_render
+    try:
+        for class_name in classes:
+            class_slices = slices_by_class[class_name]
+            timer.time('create_report', module.create_report, class_name, current_week, vstep_lesson_num, ielts_lesson_num,
+                       class_slices['all'], class_slices['feedback'], out_dir, class_slices=class_slices, engine=engine)
+    finally:
+        report_render.render = render
+    timer.seconds['create_report'] -= timer.seconds['save']
+    return timer.seconds
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(runs):
+    summary = {}
+    for stage in STAGES:
+        samples = [run[stage] for run in runs]
+        summary[stage] = {'min_s': round(min(samples), 6), 'median_s': round(statistics.median(samples), 6),
+                          'samples_s': [round(sample, 6) for sample in samples]}
+    totals = [sum(run.values()) for run in runs]
+    summary['total'] = {'min_s': round(min(totals), 6), 'median_s': round(statistics.median(totals), 6),
+                        'samples_s': [round(total, 6) for total in totals]}
+    return summary
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark the report pipeline on synthetic data.')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small')
+    parser.add_argument('--students', type=int, help='overrides the preset')
+    parser.add_argument('--classes', type=int, help='overrides the preset')
+    parser.add_argument('--comments', type=int, help='overrides the preset')
+    parser.add_argument('--grade', type=int, choices=[10, 11], default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--engine', choices=list(report_render.ENGINES), default=report_render.ENGINE_DOCX)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', help='keep the generated workbooks here instead of a temp directory')
+    parser.add_argument('--output', help='write the JSON results to this file instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv[1:])
+    size = dict(PRESETS[args.preset])
+    for key in size:
+        if getattr(args, key) is not None:
+            size[key] = getattr(args, key)
+
+    if args.grade == 10:
+        import report_grade_10 as module
+    else:
+        import report_grade_11 as module
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or os.path.join(tmp, 'data')
+        start = time.perf_counter()
+        kinds = sorted({name[len(str(args.grade))] for name in module.classes})
+        paths, classes = write_dataset(data_dir, args.grade, size['students'], size['classes'], size['comments'], kinds, seed=args.seed)
+        generate_seconds = time.perf_counter() - start
+
+        runs = []
+        # The report modules print warnings; keep stdout for the JSON results
+        with contextlib.redirect_stdout(sys.stderr):
+            for repeat in range(args.repeat):
+                out_dir = os.path.join(tmp, f'out{repeat}')
+                os.makedirs(out_dir)
+                runs.append(run_once(module, paths, classes, out_dir, args.engine))
+
+    results = {
+        'benchmark': 'pipeline',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'environment': {'python': platform.python_version(), 'pandas': pd.__version__,
+                        'platform': platform.platform(), 'cpu_count': os.cpu_count()},
+        'config': dict(size, grade=args.grade, repeat=args.repeat, engine=args.engine, seed=args.seed, preset=args.preset),
+        'dataset_seconds': round(generate_seconds, 3),
+        'stages': summarize(runs),
+    }
+    text = json.dumps(results, indent=1, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
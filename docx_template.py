@@ -0,0 +1,110 @@
+import os
+import copy
+import threading
+from docx import Document
+from docx.opc.rel import Relationships
+from docx.oxml.ns import qn
+
+# The Word template is parsed once per process and every report starts from an
+# in-memory copy of it. Only word/document.xml is edited by the report builders, so
+# a clone deep-copies that part and shares the others (styles, numbering, images,
+# theme) with the compiled template. The cache is checked against the file's mtime
+# and size on every call, so replacing the template takes effect on the next report.
+
+_lock = threading.Lock()
+_templates = {}  # absolute path -> ((mtime_ns, size), Document)
+
+
+def _compiled(path):
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = os.path.abspath(path)
+    with _lock:
+        entry = _templates.get(key)
+        if entry is None or entry[0] != signature:
+            entry = (signature, Document(path))
+            _templates[key] = entry
+    return entry[1]
+
+
+def _clone_package(template_doc):
+    template_part = template_doc.part
+    template_package = template_part.package
+
+    package = copy.copy(template_package)
+    part = type(template_part)(
+        template_part.partname,
+        template_part.content_type,
+        copy.deepcopy(template_part.element),
+        package,
+    )
+    # Outgoing relationships (styles, numbering, images...) are shared as-is
+    part.__dict__['rels'] = template_part.rels
+
+    # Package relationships point at the new main document part instead of the template's
+    rels = Relationships(template_package.rels._baseURI)
+    for rId, rel in template_package.rels.items():
+        target = rel.target_ref if rel.is_external else rel.target_part
+        if target is template_part:
+            target = part
+        rels.add_relationship(rel.reltype, target, rId, rel.is_external)
+    package.__dict__['rels'] = rels
+    return part.document
+
+
+def open_template(path):
+    """Returns a fresh Document for the template at path, equivalent to Document(path)."""
+    template_doc = _compiled(path)
+    with _lock:
+        return _clone_package(template_doc)
+
+
+def _prototype_row(tbl, filled):
+    """The <w:tr> Table.add_row() builds, with a paragraph and run ready in the first `filled` cells."""
+    tr = tbl._new_tr()
+    for index, gridCol in enumerate(tbl.tblGrid.gridCol_lst):
+        tc = tr.add_tc()
+        if gridCol.w is not None:
+            tc.width = gridCol.w
+        if index < filled:
+            tc.clear_content()
+            tc.add_p().add_r()
+    return tr
+
+
+def add_rows(table, rows):
+    """
+    Appends one row per sequence of cell texts, like table.add_row() followed by
+    row.cells[i].text = value, but without creating python-docx proxies per cell.
+    Each row is a copy of a prototype <w:tr>; all rows are attached in one operation.
+    Texts beyond the table's column count are ignored.
+    """
+    tbl = table._tbl
+    column_count = len(tbl.tblGrid.gridCol_lst)
+    prototypes = {}
+    new_rows = []
+    for texts in rows:
+        texts = list(texts)[:column_count]
+        prototype = prototypes.get(len(texts))
+        if prototype is None:
+            prototype = prototypes[len(texts)] = _prototype_row(tbl, len(texts))
+        tr = copy.deepcopy(prototype)
+        for run, text in zip(tr.iter(qn('w:r')), texts):
+            run.text = text
+        new_rows.append(tr)
+    tbl.extend(new_rows)
+
+
+def set_run_fonts(doc, xpath, name, size):
+    """Sets font name (ascii, hAnsi, eastAsia) and size on every run matched by one XPath query."""
+    for r in doc.element.xpath(xpath):
+        rPr = r.get_or_add_rPr()
+        rPr.rFonts_ascii = name
+        rPr.rFonts_hAnsi = name
+        rPr.rFonts.set(qn('w:eastAsia'), name)
+        rPr.sz_val = size
+
+
+def clear():
+    with _lock:
+        _templates.clear()
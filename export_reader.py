@@ -0,0 +1,124 @@
+import os
+import pandas as pd
+
+# Reader for the learning-platform exports uploaded as file_10 / file_11.
+# Only the columns clean_data uses are kept, with explicit types, so large exports
+# don't have to be materialized in full. The reader is chosen from the file extension.
+
+TEXT = 'text'
+NUMBER = 'number'
+RAW = 'raw'
+
+EXPORT_COLUMNS = {
+    # Merge key: left untyped so it matches however read_excel inferred the roster's IDs
+    'User ID': RAW,
+    'Status': TEXT,
+    'Progress': TEXT,
+    'Study Time': RAW,  # 'H:MM' text, but Excel time cells are passed through untouched
+    'Units(lessons) Passed': NUMBER,
+    'Units(lessons) Studied': NUMBER,
+    # Only needed so the roster merge produces the 'English Class_y' / 'Main Class_y' names clean_data selects
+    'English Class': RAW,
+    'Main Class': RAW,
+}
+
+# Same strings pd.read_excel / pd.read_csv treat as missing by default
+NA_STRINGS = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+              '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'}
+
+CSV_EXTENSIONS = ('.csv',)
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+STREAMING_EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+def _as_text(values):
+    text = values.astype(object)
+    present = text.notna()
+    text[present] = text[present].astype(str)
+    return text
+
+
+def _as_number(values):
+    numbers = pd.to_numeric(values, errors='coerce')
+    # Whole numbers stored as floats would otherwise show up as '12.0' in the report tables
+    if numbers.dtype.kind == 'f' and numbers.notna().all() and (numbers % 1 == 0).all():
+        numbers = numbers.astype('int64')
+    return numbers
+
+
+def _apply_types(df):
+    for column in df.columns:
+        kind = EXPORT_COLUMNS[column]
+        if kind == TEXT:
+            df[column] = _as_text(df[column])
+        elif kind == NUMBER:
+            df[column] = _as_number(df[column])
+    return df
+
+
+def _read_xlsx_streaming(path):
+    """Streams rows with openpyxl's read-only reader and keeps only the EXPORT_COLUMNS cells."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+
+        wanted = []
+        seen = set()
+        for index, name in enumerate(header):
+            # First occurrence wins, like pandas (later duplicates would be renamed 'X.1')
+            if name in EXPORT_COLUMNS and name not in seen:
+                wanted.append((index, name))
+                seen.add(name)
+
+        columns = {name: [] for _, name in wanted}
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            for index, name in wanted:
+                value = row[index] if index < len(row) else None
+                if isinstance(value, str) and value in NA_STRINGS:
+                    value = None
+                columns[name].append(value)
+    finally:
+        workbook.close()
+
+    return pd.DataFrame(columns)
+
+
+def _read_csv(path):
+    # RAW columns are inferred, as read_excel would for the same values
+    text_columns = {name: str for name, kind in EXPORT_COLUMNS.items() if kind == TEXT}
+    return pd.read_csv(path, usecols=lambda col: col in EXPORT_COLUMNS, dtype=text_columns, encoding='utf-8-sig')
+
+
+def _read_parquet(path):
+    # pyarrow is optional (requirements_parquet.txt); it's too large for the serverless bundle
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Máy chủ này không hỗ trợ file Parquet (chưa cài pyarrow). "
+                         "Vui lòng tải lên file .xlsx hoặc .csv.") from None
+
+    available = pq.ParquetFile(path).schema_arrow.names
+    return pd.read_parquet(path, engine='pyarrow', columns=[col for col in available if col in EXPORT_COLUMNS])
+
+
+def read_platform_export(path):
+    """
+    Loads a learning-platform export (.xlsx, .csv or .parquet) with only the columns
+    clean_data needs. Other Excel formats fall back to pd.read_excel.
+    """
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext in CSV_EXTENSIONS:
+        df = _read_csv(path)
+    elif ext in PARQUET_EXTENSIONS:
+        df = _read_parquet(path)
+    elif ext in STREAMING_EXCEL_EXTENSIONS:
+        df = _read_xlsx_streaming(path)
+    else:
+        df = pd.read_excel(path)
+        df = df[[col for col in df.columns if col in EXPORT_COLUMNS]]
+    return _apply_types(df)
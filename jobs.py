@@ -0,0 +1,141 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Background report-generation jobs for the asynchronous /generate/jobs API.
+# A job runs the same pipeline as /generate on a small thread pool and records
+# per-stage and per-class progress that the status endpoint returns while it runs.
+# Jobs live in this process's memory and are forgotten PCT_JOB_TTL seconds after
+# they finish. Serverless hosts freeze the process between requests, so jobs are
+# off on Vercel unless PCT_ASYNC_JOBS=1.
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.environ.get('PCT_JOB_WORKERS', 2))
+JOB_TTL_SECONDS = float(os.environ.get('PCT_JOB_TTL', 3600))
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+_lock = threading.Lock()
+_jobs = {}
+_executor = None
+
+
+def enabled():
+    setting = os.environ.get('PCT_ASYNC_JOBS')
+    if setting is None:
+        return not os.environ.get('VERCEL')
+    return setting.lower() in ('1', 'true', 'yes')
+
+
+def _elapsed_ms(start, end=None):
+    return round(((end or time.time()) - start) * 1000)
+
+
+class Job:
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.stages = {}   # group ('Grade_10', 'Grade_11', 'shared') -> {stage: status}
+        self.classes = {}  # group -> {'total', 'done', 'reused', 'failed', 'reports'}
+        self.result = None
+        self.message = None
+        self._lock = threading.Lock()
+
+    def stage(self, group, stage, status=RUNNING):
+        """Records a stage; starting one marks whatever ran before it in the same group as done."""
+        with self._lock:
+            stages = self.stages.setdefault(group, {})
+            if status == RUNNING:
+                for name, previous in stages.items():
+                    if previous == RUNNING:
+                        stages[name] = DONE
+            stages[stage] = status
+
+    def progress(self, group, event, **fields):
+        """Observer passed (per grade) to the generators' progress= argument."""
+        if event == 'stage':
+            self.stage(group, fields['stage'], fields.get('status', RUNNING))
+            return
+        with self._lock:
+            classes = self.classes.setdefault(group, {'total': 0, 'done': 0, 'reused': 0, 'failed': 0, 'reports': []})
+            if event == 'render':
+                classes['total'] = fields['total']
+            elif event == 'class':
+                if fields.get('file'):
+                    classes['done'] += 1
+                    classes['reused'] += 1 if fields.get('reused') else 0
+                    classes['reports'].append(fields['file'])
+                else:
+                    classes['failed'] += 1
+
+    def _finish(self, status):
+        with self._lock:
+            for stages in self.stages.values():
+                for name, stage_status in stages.items():
+                    if stage_status == RUNNING:
+                        stages[name] = DONE if status == DONE else FAILED
+            self.status = status
+            self.finished_at = time.time()
+
+    def run(self, fn, *args, **kwargs):
+        with self._lock:
+            self.status = RUNNING
+            self.started_at = time.time()
+        try:
+            self.result = fn(self, *args, **kwargs)
+        except Exception as e:
+            logger.error(f"Job {self.id} failed: {e}")
+            self.message = str(e)
+            self._finish(FAILED)
+            return
+        self._finish(DONE if self.result is None or self.result.get('success', True) else FAILED)
+
+    def to_dict(self):
+        with self._lock:
+            data = {
+                'jobId': self.id,
+                'status': self.status,
+                'stages': {group: dict(stages) for group, stages in self.stages.items()},
+                'classes': {group: dict(classes, reports=list(classes['reports']))
+                            for group, classes in self.classes.items()},
+                'elapsedMs': _elapsed_ms(self.started_at, self.finished_at) if self.started_at else 0,
+            }
+            if self.message:
+                data['message'] = self.message
+            if self.status in (DONE, FAILED) and self.result is not None:
+                data['result'] = self.result
+            return data
+
+
+def _expire(now):
+    for job_id in [job_id for job_id, job in _jobs.items()
+                   if job.finished_at and now - job.finished_at > JOB_TTL_SECONDS]:
+        del _jobs[job_id]
+
+
+def submit(fn, *args, **kwargs):
+    """Queues fn(job, *args, **kwargs) and returns the Job; fn's return value becomes job.result."""
+    global _executor
+    job = Job()
+    with _lock:
+        _expire(time.time())
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='report-job')
+        _jobs[job.id] = job
+    _executor.submit(job.run, fn, *args, **kwargs)
+    return job
+
+
+def get(job_id):
+    with _lock:
+        return _jobs.get(job_id)
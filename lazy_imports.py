@@ -0,0 +1,79 @@
+import time
+import logging
+import importlib
+import threading
+from contextlib import contextmanager
+
+# Heavy modules (pandas, python-docx, mammoth, the report engines) are imported on
+# first use instead of at app startup, so '/', '/debug' and static assets stay cheap
+# on a cold start. Every import is timed so cold-start cost can be tracked per module.
+
+logger = logging.getLogger(__name__)
+
+PROCESS_START = time.perf_counter()
+
+# Dependencies of the report pipeline, in import order. Importing pandas/docx first
+# keeps their cost out of the report module timings.
+REPORT_MODULES = ['pandas', 'docx', 'analysis', 'static_cache', 'xml_template', 'docx_template', 'report_render', 'timesheet', 'export_reader', 'study_time', 'report_grade_10', 'report_grade_11']
+
+_lock = threading.RLock()
+_modules = {}
+import_timings = {}   # module name -> {'ms': float, 'phase': str}
+milestones = {}       # e.g. 'app_ready', 'report_modules_ready' -> ms since process start
+
+
+def _elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+@contextmanager
+def timed(name, phase='startup'):
+    """Times an import statement written inline, e.g. `with timed('flask'): import flask`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        import_timings.setdefault(name, {'ms': _elapsed_ms(start), 'phase': phase})
+
+
+def load(name, phase='lazy'):
+    """Imports a module on first use and keeps it warm for later calls."""
+    module = _modules.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        if name not in _modules:
+            start = time.perf_counter()
+            _modules[name] = importlib.import_module(name)
+            import_timings.setdefault(name, {'ms': _elapsed_ms(start), 'phase': phase})
+            logger.info(f"Lazy import of {name} took {import_timings[name]['ms']} ms")
+        return _modules[name]
+
+
+def load_report_modules():
+    """Loads the report engines (and their static data) on the first generation request."""
+    if 'report_modules_ready' not in milestones:
+        with _lock:
+            if 'report_modules_ready' not in milestones:
+                start = time.perf_counter()
+                for name in REPORT_MODULES:
+                    load(name, phase='first_generation')
+                milestones['report_modules_ms'] = _elapsed_ms(start)
+                milestones['report_modules_ready'] = _elapsed_ms(PROCESS_START)
+    return _modules['report_grade_10'], _modules['report_grade_11']
+
+
+def mark(milestone):
+    milestones.setdefault(milestone, _elapsed_ms(PROCESS_START))
+
+
+def startup_report():
+    """Per-module import cost, split by phase, plus startup milestones."""
+    phases = {}
+    for name, entry in sorted(import_timings.items(), key=lambda kv: -kv[1]['ms']):
+        phases.setdefault(entry['phase'], {})[name] = entry['ms']
+    return {
+        'milestones_ms': dict(milestones),
+        'imports_ms': phases,
+        'loaded': sorted(_modules),
+    }
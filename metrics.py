@@ -0,0 +1,168 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# In-process timing spans and cumulative histograms, rendered in the Prometheus text format
+# by the /metrics route. Stage spans cover every step of the grade pipelines (parsing,
+# cleaning, stats, rendering), the shared timesheet parse and mammoth previews; request
+# latency is recorded per Flask route. Values are per process: with several server
+# workers, each one reports its own series.
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+COUNT_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+BYTES_BUCKETS = (10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+
+_registry = []
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        lines = []
+        for key in sorted(series):
+            values = series[key]
+            labels = list(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{_format_labels(labels + [("le", _format_value(bound))])} {count}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(values[-2])}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {values[-1]}')
+        return 'histogram', lines
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        return 'counter', [f'{self.name}{_format_labels(list(zip(self.labelnames, key)))} {_format_value(values[key])}'
+                           for key in sorted(values)]
+
+
+STAGE_SECONDS = Histogram('pct_stage_duration_seconds', 'Time spent in each pipeline stage.', ['group', 'stage'])
+REQUEST_SECONDS = Histogram('pct_http_request_duration_seconds', 'Flask request latency, until the response is returned.',
+                            ['method', 'route', 'status'])
+ROWS_PROCESSED = Histogram('pct_rows_processed', 'Rows per pipeline run, by grade and stage.', ['group', 'stage'], COUNT_BUCKETS)
+REPORTS_RENDERED = Histogram('pct_reports_per_run', 'Class reports produced per grade run.', ['group', 'outcome'], COUNT_BUCKETS)
+REPORT_BYTES = Histogram('pct_report_bytes', 'Size of each rendered report file.', ['group'], BYTES_BUCKETS)
+REPORTS_TOTAL = Counter('pct_reports_total', 'Class reports produced, by outcome.', ['group', 'outcome'])
+
+
+class StageSpans:
+    """
+    Back-to-back spans for a pipeline: start() ends the running stage and begins the next,
+    finish() ends the last one. Each span is observed in STAGE_SECONDS and, if given,
+    passed to on_span(stage, seconds).
+    """
+
+    def __init__(self, group, on_span=None):
+        self.group = group
+        self.on_span = on_span
+        self._stage = None
+        self._started = None
+
+    def start(self, stage):
+        now = time.perf_counter()
+        self._end(now)
+        self._stage, self._started = stage, now
+
+    def finish(self):
+        self._end(time.perf_counter())
+        self._stage = None
+
+    def _end(self, now):
+        if self._stage is None:
+            return
+        seconds = now - self._started
+        STAGE_SECONDS.observe(seconds, group=self.group, stage=self._stage)
+        if self.on_span is not None:
+            self.on_span(self._stage, seconds)
+
+
+@contextmanager
+def span(group, stage, on_span=None):
+    """Times the with-block as one stage span."""
+    spans = StageSpans(group, on_span)
+    spans.start(stage)
+    try:
+        yield
+    finally:
+        spans.finish()
+
+
+def record_reports(group, rendered_paths, reused, failed):
+    """Per-run report counts and the size of every newly written report."""
+    for outcome, count in (('rendered', len(rendered_paths)), ('reused', reused), ('failed', failed)):
+        REPORTS_RENDERED.observe(count, group=group, outcome=outcome)
+        if count:
+            REPORTS_TOTAL.inc(count, group=group, outcome=outcome)
+    for path in rendered_paths:
+        try:
+            REPORT_BYTES.observe(os.path.getsize(path), group=group)
+        except OSError:
+            pass
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        kind, samples = metric.samples()
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {kind}')
+        lines.extend(samples)
+    return '\n'.join(lines) + '\n'
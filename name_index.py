@@ -0,0 +1,76 @@
+import unicodedata
+from collections import defaultdict
+
+_fold_cache = {}
+
+
+def _fold_char(ch):
+    folded = _fold_cache.get(ch)
+    if folded is None:
+        decomposed = unicodedata.normalize('NFD', ch)
+        folded = ''.join(c for c in decomposed if not unicodedata.combining(c)).replace('đ', 'd').replace('Đ', 'D')
+        _fold_cache[ch] = folded
+    return folded
+
+
+def fold_text(text):
+    """
+    Lowercase, accent-insensitive form of text ('Đặng Thị Hà' -> 'dang thi ha').
+    Folding is per character, so a substring of a name stays a substring after folding.
+    """
+    return ''.join(map(_fold_char, str(text).lower()))
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class StudentNameIndex:
+    """
+    Name lookup for one class roster, built once per run and shared by all feedback comments.
+
+    Candidates come from a trigram index over accent-folded names; each candidate is then
+    checked with the original rule (lowercased query is a substring of the lowercased
+    Full_Name), so find() resolves the same first student, in roster order, as a full scan.
+    """
+
+    def __init__(self, students, name_col='Full_Name', class_col='Main_Class_y'):
+        students = students[[name_col, class_col]].dropna()
+        self.names = students[name_col].tolist()
+        self.main_classes = students[class_col].tolist()
+        self._lower_names = [str(name).lower() for name in self.names]
+        self._postings = defaultdict(set)
+        for pos, name in enumerate(self._lower_names):
+            for gram in _trigrams(fold_text(name)):
+                self._postings[gram].add(pos)
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _candidates(self, query_lower):
+        folded = fold_text(query_lower)
+        if len(folded) < 3:
+            return range(len(self.names))
+        postings = []
+        for gram in _trigrams(folded):
+            positions = self._postings.get(gram)
+            if not positions:
+                return []
+            postings.append(positions)
+        postings.sort(key=len)
+        return sorted(set.intersection(*postings))
+
+    def find(self, query):
+        """Returns (full_name, main_class) of the first matching student, or None."""
+        query_lower = query.strip().lower()
+        if query_lower in self._cache:
+            return self._cache[query_lower]
+
+        result = None
+        for pos in self._candidates(query_lower):
+            if query_lower in self._lower_names[pos]:
+                result = (self.names[pos], self.main_classes[pos])
+                break
+        self._cache[query_lower] = result
+        return result
@@ -0,0 +1,110 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+
+def get_worker_count(workers=None):
+    """
+    Number of processes used to render class reports.
+    Falls back to the PCT_RENDER_WORKERS environment variable; 1 means sequential.
+    Workers are started with forkserver/spawn and re-import the __main__ module, so a
+    script using more than one must keep its top-level code under `if __name__ == '__main__':`.
+    """
+    if workers is None:
+        try:
+            workers = int(os.environ.get('PCT_RENDER_WORKERS', 1))
+        except ValueError:
+            workers = 1
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def _mp_context(render_fn):
+    """
+    forkserver (spawn where unavailable): the pool is created from /generate's worker
+    threads, and forking a process with threads can copy a lock another thread holds
+    (logging, the template cache, imports) and deadlock the child. The fork server
+    preloads render_fn's module, so workers don't each re-import pandas and python-docx.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([render_fn.__module__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def render_classes(render_fn, class_jobs, workers, on_done=None):
+    """
+    Runs render_fn(*args) for each (class_name, args) in class_jobs on a process pool.
+    args should only carry that class's slice of the data, since it is pickled per job.
+
+    Returns (results, failures): results maps class_name -> return value for the classes
+    that rendered, failures is a list of {'className', 'error'} for the ones that raised.
+    A failing class never aborts the others.
+
+    on_done(class_name, result, error) is called in the calling process as each class
+    finishes, in completion order; error is None on success.
+
+    If the pool breaks (a worker died, or workers can't start, e.g. an unguarded __main__),
+    the classes it didn't finish are rendered sequentially in this process.
+    """
+    results = {}
+    failures = []
+
+    def finished(class_name, result=None, error=None):
+        if error is None:
+            results[class_name] = result
+        else:
+            failures.append({'className': class_name, 'error': error})
+        if on_done is not None:
+            on_done(class_name, result, error)
+
+    def render_sequentially(jobs):
+        for class_name, args in jobs:
+            try:
+                result = render_fn(*args)
+            except Exception as e:
+                logging.error(f"Error rendering {class_name}: {e}")
+                finished(class_name, error=str(e))
+                continue
+            finished(class_name, result)
+
+    order = {class_name: index for index, (class_name, _) in enumerate(class_jobs)}
+
+    try:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(class_jobs)) or 1, mp_context=_mp_context(render_fn))
+    except (OSError, NotImplementedError, ValueError) as e:
+        # Some serverless runtimes have no /dev/shm for multiprocessing locks
+        logging.warning(f"Process pool unavailable ({e}), rendering sequentially")
+        pool = None
+
+    if pool is None:
+        render_sequentially(class_jobs)
+        return results, failures
+
+    broken = []
+    with pool:
+        futures = {pool.submit(render_fn, *args): (class_name, args) for class_name, args in class_jobs}
+        for future in as_completed(futures):
+            class_name, args = futures[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                broken.append((class_name, args))
+                continue
+            except Exception as e:
+                logging.error(f"Error rendering {class_name}: {e}")
+                finished(class_name, error=str(e))
+                continue
+            finished(class_name, result)
+
+    if broken:
+        logging.warning(f"Process pool broke, rendering {len(broken)} class(es) sequentially")
+        render_sequentially(sorted(broken, key=lambda job: order[job[0]]))
+
+    # Report failures in job order, not completion order
+    failures.sort(key=lambda failure: order[failure['className']])
+    return results, failures
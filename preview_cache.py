@@ -0,0 +1,130 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import lazy_imports
+import metrics
+
+# HTML previews of generated reports, keyed by the SHA-256 of the .docx bytes so a
+# regenerated report never serves a stale preview. Entries are evicted least recently
+# used first once the cache exceeds PCT_PREVIEW_CACHE_MB, and dropped after
+# PCT_PREVIEW_CACHE_TTL seconds. With PCT_EAGER_PREVIEWS=1 previews are rendered in the
+# background right after generation, so the first click is already a cache hit.
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = int(float(os.environ.get('PCT_PREVIEW_CACHE_MB', 64)) * 1024 * 1024)
+MAX_AGE_SECONDS = float(os.environ.get('PCT_PREVIEW_CACHE_TTL', 3600))
+EAGER = os.environ.get('PCT_EAGER_PREVIEWS', '').lower() in ('1', 'true', 'yes')
+MAX_DIGESTS = 1024
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # sha256 -> (html, created_at)
+_total_bytes = 0
+_digests = {}             # path -> ((mtime_ns, size), sha256), so unchanged files aren't re-hashed
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+_executor = None
+
+
+def _remember(path, signature, digest):
+    with _lock:
+        if len(_digests) >= MAX_DIGESTS:
+            # Reports of replaced weeks are deleted with their workspace; then the oldest go
+            for known_path in [known_path for known_path in _digests if not os.path.exists(known_path)]:
+                del _digests[known_path]
+            while len(_digests) >= MAX_DIGESTS:
+                del _digests[next(iter(_digests))]
+        _digests.pop(path, None)
+        _digests[path] = (signature, digest)
+
+
+def _file_digest(path):
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        known = _digests.get(path)
+    if known is not None and known[0] == signature:
+        return known[1]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    _remember(path, signature, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def _size(html):
+    return len(html.encode('utf-8'))
+
+
+def _drop(key):
+    global _total_bytes
+    html, _ = _entries.pop(key)
+    _total_bytes -= _size(html)
+
+
+def _evict(now):
+    """Drops expired entries, then the least recently used ones until under MAX_BYTES."""
+    for key in [key for key, (_, created_at) in _entries.items() if now - created_at > MAX_AGE_SECONDS]:
+        _drop(key)
+        _stats['evictions'] += 1
+    while _entries and _total_bytes > MAX_BYTES:
+        _drop(next(iter(_entries)))
+        _stats['evictions'] += 1
+
+
+def _convert(path):
+    mammoth = lazy_imports.load('mammoth')
+    with metrics.span('preview', 'mammoth'), open(path, 'rb') as docx_file:
+        return mammoth.convert_to_html(docx_file).value
+
+
+def get_html(path):
+    """HTML preview of the report at path, converted with mammoth on a cache miss."""
+    global _total_bytes
+    key = _file_digest(path)
+    now = time.time()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and now - entry[1] <= MAX_AGE_SECONDS:
+            _entries.move_to_end(key)
+            _stats['hits'] += 1
+            return entry[0]
+        _stats['misses'] += 1
+
+    html = _convert(path)
+    with _lock:
+        if key in _entries:
+            _drop(key)
+        _entries[key] = (html, now)
+        _total_bytes += _size(html)
+        _evict(now)
+    return html
+
+
+def _prerender(paths):
+    for path in paths:
+        try:
+            get_html(path)
+        except Exception as e:
+            logger.warning(f"Preview prerender failed for {path}: {e}")
+
+
+def prerender(paths, eager=None):
+    """Queues previews for freshly generated reports when eager rendering is enabled."""
+    global _executor
+    if not (EAGER if eager is None else eager) or not paths:
+        return None
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='preview')
+    return _executor.submit(_prerender, list(paths))
+
+
+def stats():
+    with _lock:
+        return dict(_stats, entries=len(_entries), digests=len(_digests), bytes=_total_bytes, max_bytes=MAX_BYTES,
+                    max_age_seconds=MAX_AGE_SECONDS, eager=EAGER)
@@ -0,0 +1,36 @@
+import os
+import logging
+import tempfile
+
+# Per-user cache directories in the shared temp directory, for files that are trusted when
+# read back (unpickled static workbooks, ZIPs served as downloads). A directory is only used
+# while it is private: a real directory owned by this user with no group/other permissions
+# (created with mode 0700), so no other local user can plant or swap files in it.
+
+logger = logging.getLogger(__name__)
+
+_UID = os.getuid() if hasattr(os, 'getuid') else None
+
+
+def user_temp_path(name):
+    """<temp dir>/<name>-<uid>; just <name> on platforms without uids."""
+    return os.path.join(tempfile.gettempdir(), f'{name}-{_UID}' if _UID is not None else name)
+
+
+def private_dir(path, create=False):
+    """path if it is a directory only this user can access, else None."""
+    if create:
+        try:
+            os.makedirs(path, mode=0o700, exist_ok=True)
+        except OSError:
+            return None
+    if os.path.islink(path) or not os.path.isdir(path):
+        return None
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return None
+    if _UID is not None and (info.st_uid != _UID or info.st_mode & 0o077):
+        logger.warning(f"Ignoring cache directory {path}: not private to this user")
+        return None
+    return path
@@ -0,0 +1,134 @@
+import os
+import io
+import hmac
+import time
+import uuid
+import pstats
+import cProfile
+import logging
+import tempfile
+import functools
+import threading
+from concurrent.futures import Future
+from flask import request, make_response, Response
+
+# On-demand profiling of single requests. Off unless PCT_PROFILING=1; when on, a request to a
+# @profiled route carrying the X-PCT-Profile header or ?profile= query parameter runs under
+# cProfile. If PCT_PROFILE_TOKEN is set, the header/parameter value must equal it.
+#
+# The profile is saved in PROFILE_DIR as a .prof file (pstats format: python -m pstats,
+# snakeviz, ...) whose name is returned in the X-PCT-Profile-File header. With
+# ?profile_output=inline the response is replaced by the top of the cumulative-time report.
+# Only one request is profiled at a time; others run normally.
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('PCT_PROFILING', '').lower() in ('1', 'true', 'yes')
+TOKEN = os.environ.get('PCT_PROFILE_TOKEN') or None
+PROFILE_DIR = os.environ.get('PCT_PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'pct_profiles')
+KEEP_FILES = int(os.environ.get('PCT_PROFILE_KEEP', 20))
+HEADER = 'X-PCT-Profile'
+INLINE_LINES = 60
+
+_lock = threading.Lock()
+_state = threading.local()
+
+
+def requested():
+    """True if profiling is enabled and the current request asks for it with a valid token."""
+    if not ENABLED:
+        return False
+    value = request.headers.get(HEADER) or request.args.get('profile')
+    if not value:
+        return False
+    if TOKEN is not None and not hmac.compare_digest(value, TOKEN):
+        logger.warning(f"Rejected profiling request for {request.path}: bad token")
+        return False
+    return True
+
+
+def active():
+    """True while the current thread is running a profiled request."""
+    return getattr(_state, 'active', False)
+
+
+class InlineExecutor:
+    """Executor that runs work in the calling thread, so cProfile sees it."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def _prune():
+    files = sorted((entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith('.prof')),
+                   key=lambda entry: entry.stat().st_mtime)
+    for entry in files[:max(len(files) - KEEP_FILES, 0)]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _save(profiler, endpoint):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{uuid.uuid4().hex[:8]}.prof"
+    profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+    _prune()
+    return name
+
+
+def _report(profiler):
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(INLINE_LINES)
+    return stream.getvalue()
+
+
+def profiled(view):
+    """Route decorator: profiles the request when requested() says so."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not requested():
+            return view(*args, **kwargs)
+        if not _lock.acquire(blocking=False):
+            response = make_response(view(*args, **kwargs))
+            response.headers[f'{HEADER}-Status'] = 'busy'
+            return response
+
+        profiler = cProfile.Profile()
+        _state.active = True
+        try:
+            profiler.enable()
+            try:
+                response = make_response(view(*args, **kwargs))
+                if response.is_streamed:
+                    # Consume streamed bodies (ZIP downloads) here so they are part of the profile
+                    response.make_sequence()
+            finally:
+                profiler.disable()
+        finally:
+            _state.active = False
+            _lock.release()
+
+        try:
+            name = _save(profiler, request.endpoint)
+        except OSError as e:
+            logger.error(f"Could not save profile: {e}")
+            name = None
+
+        if request.args.get('profile_output') == 'inline':
+            response = Response(_report(profiler), mimetype='text/plain')
+        if name:
+            response.headers[f'{HEADER}-File'] = name
+        return response
+    return wrapper
@@ -1,14 +1,21 @@
 
 import pandas as pd
-from docx import Document
+import numpy as np
 import os
-from datetime import datetime, timedelta
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.shared import Pt
-from docx.oxml.ns import qn
+from datetime import datetime
 import math
 import re
 import analysis
+import static_cache
+import parallel_render
+import timesheet
+import export_reader
+import upload_cache
+import study_time
+import metrics
+import report_manifest
+import report_render
+from name_index import StudentNameIndex
 
 # Global config
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -79,7 +86,7 @@ def load_static_file(name, default_cols=None):
     try:
         if not os.path.exists(path):
             raise FileNotFoundError(f"File not found: {path}. Current Dir Files: {os.listdir(root_path)}")
-        return pd.read_excel(path)
+        return static_cache.read_excel_cached(path)
     except Exception as e:
         print(f"CRITICAL: Failed to load {name}: {e}")
         return pd.DataFrame(columns=default_cols) if default_cols else pd.DataFrame()
@@ -92,12 +99,6 @@ list_11 = load_static_file('StudentList11.xlsx', default_cols=['User ID'])
 ielts_lesson_total = 54
 vstep_lesson_total = 52
 
-def read_excel(file_path):
-    data = pd.read_excel(file_path)
-    # Standardize columns by stripping whitespace
-    data.columns = [str(c).strip() for c in data.columns]
-    return data
-
 def convert_to_exponential(value):
     if isinstance(value, str) and re.fullmatch(r'^\d+$', value):
         value = int(value)
@@ -128,72 +129,68 @@ def clean_data(data, list_df):
     df.columns = df.columns.str.replace('(', '', regex=False).str.replace(')', '', regex=False).str.replace(' ', '_')
     for column in df.columns:
         df = df.dropna(subset=[column])
+    # Parsed once here; the average-time column and the dashboard stats reuse it
+    df[study_time.MINUTES_COLUMN] = study_time.to_minutes(df['Study_Time'])
     return df
 
-def set_status(class_type, num_user_lesson, ielts_lesson_num, vstep_lesson_num):
-    num_week_lesson = 0
-    if class_type == "IELTS":
-        num_week_lesson = ielts_lesson_num
-    elif class_type == "VSTEP":
-        num_week_lesson = vstep_lesson_num
-    else:
-        return "Unknown"
-
-    if num_user_lesson == num_week_lesson:
-        return "keep up"
-    elif num_user_lesson < num_week_lesson: 
-        return "late"
-    elif num_user_lesson > num_week_lesson:
-        return "far away"
-    return "Unknown"
-
-def calculate_average_time_per_lesson_in_minutes(total_time: str, total_lessons: int) -> str:
-    if total_lessons != 0 and isinstance(total_time, str):
-        try:
-            parts = list(map(int, total_time.split(':')))
-            if len(parts) >= 2:
-                hours, minutes = parts[0], parts[1]
-                total_minutes = hours * 60 + minutes
-                avg_minutes = round(total_minutes / total_lessons, 1)
-                return f"{avg_minutes} phút"
-        except Exception:
-            return "0 phút"
-    return "0 phút"
-
 def add_contribute_to_dataframe(data, ielts_lesson_num, vstep_lesson_num):
-    for index, row in data.iterrows():
-        status = set_status(row['Type'], row['Unitslessons_Passed'], ielts_lesson_num, vstep_lesson_num)
-        average_time = calculate_average_time_per_lesson_in_minutes(row['Study_Time'], row['Unitslessons_Passed'])
-        data.at[index, 'Status'] = status
-        data.at[index, 'Average_time_per_lesson'] = average_time
+    passed = pd.to_numeric(data['Unitslessons_Passed'], errors='coerce')
+
+    # Status: passed lessons against this week's target for the class type; other types are 'Unknown'
+    week_lesson = np.select([data['Type'] == 'IELTS', data['Type'] == 'VSTEP'],
+                            [ielts_lesson_num, vstep_lesson_num], default=np.nan)
+    data['Status'] = np.select([passed == week_lesson, passed < week_lesson, passed > week_lesson],
+                               ['keep up', 'late', 'far away'], default='Unknown')
+
+    # Average time per passed lesson; "0 phút" when the study time is unreadable or nothing was passed
+    if study_time.MINUTES_COLUMN in data.columns:
+        total_minutes = data[study_time.MINUTES_COLUMN]
+    else:
+        total_minutes = study_time.to_minutes(data['Study_Time'])
+    valid = (total_minutes.notna() & (passed != 0)).astype(bool)
+    # Python's round() rather than np.round so the text matches the per-row version exactly
+    avg_minutes = [round(m / p, 1) for m, p in zip(total_minutes[valid].astype(float).tolist(), passed[valid].tolist())]
+
+    average_minutes = pd.Series(0.0, index=data.index)
+    average_minutes[valid] = avg_minutes
+    average_text = pd.Series('0 phút', index=data.index, dtype=object)
+    average_text[valid] = [f"{avg} phút" for avg in avg_minutes]
+
+    data['Average_time_per_lesson'] = average_text.astype(str)
+    # Numeric copy so later stages don't re-parse the "x phút" text
+    data['Average_time_per_lesson_Minutes'] = average_minutes
+
+# Per-class slices of the cleaned data
+STATUS_GROUPS = ['late', 'keep up', 'far away']
+
+def empty_class_slices(data):
+    empty = data.iloc[0:0]
+    return {'all': empty, **{status: empty for status in STATUS_GROUPS}}
+
+def partition_by_class(data):
+    """
+    Splits the cleaned data once into {class_name: slices}. 'all' keeps the original row order;
+    'late' / 'keep up' / 'far away' are pre-sorted by Unitslessons_Passed (descending).
+    """
+    partitions = {}
+    for class_name, class_df in data.groupby('English_Class_y', sort=False):
+        partitions[class_name] = {'all': class_df, **{status: class_df.iloc[0:0] for status in STATUS_GROUPS}}
+
+    # Groups keep the original row order, so sorting each one matches the old per-class filter + sort
+    for (class_name, status), status_df in data.groupby(['English_Class_y', 'Status'], sort=False):
+        if status in STATUS_GROUPS:
+            partitions[class_name][status] = status_df.sort_values(by='Unitslessons_Passed', ascending=False)
+    return partitions
 
 # Helper to process feedback
 def get_processed_feedback(classes, feedback_path=None):
     if feedback_path is None:
         feedback_path = os.path.join(BASE_DIR, "PCT Teacher Timesheet  (Responses).xlsx")
     
-    if not os.path.exists(feedback_path):
-        return pd.DataFrame(columns=['Date', 'Class', 'Your_name', 'Comments'])
-    
-    data_feedback = read_excel(feedback_path)
-    data_feedback.columns = data_feedback.columns.str.replace('(', '', regex=False).str.replace(')', '', regex=False).str.replace(' ', '_')
-    data_feedback = data_feedback[['Date', 'Class','Your_name', 'Comments']]
-    data_feedback = data_feedback.astype(str)
-    data_feedback['Date'] = pd.to_datetime(data_feedback['Date'], errors='coerce')
-    
-    now = datetime.today()
-    today = now - timedelta(days=now.isoweekday() % 7)
-    one_week_ago = today - timedelta(days=7)
-    
-    data_feedback = data_feedback[(data_feedback['Date'] >= one_week_ago ) & (data_feedback['Date'] <= today)]
-    data_feedback['Class'] = data_feedback['Class'].str.upper()
-    data_feedback['Class'] = data_feedback['Class'].apply(convert_to_exponential)
-    
-    return data_feedback
+    # Shared with the other grade so /generate can parse the timesheet once
+    return timesheet.load_timesheet(feedback_path)
 
-def create_report(class_name, current_week, vstep_lesson_num, ielts_lesson_num, data, data_feedback, output_dir, 
-                  course_vstep="Practical English A2-B2", course_ielts="Practical English B2 & IELTS A2-B1",
-                  total_ielts=54, total_vstep=52):
+def get_template_path():
     template_path = os.path.join(BASE_DIR, 'word_template - Copy.docx')
     if not os.path.exists(template_path):
         template_path = os.path.join(BASE_DIR, 'word_template.docx')
@@ -201,25 +198,21 @@ def create_report(class_name, current_week, vstep_lesson_num, ielts_lesson_num,
     if not os.path.exists(template_path):
         print(f"Error: Template file not found at {template_path}")
         return None
-    
-    doc = Document(template_path)
-    tables = doc.tables
+    return template_path
 
+def get_class_type(class_name):
     # Defensive check for class name format
     if len(class_name) < 3:
-        class_type = "VSTEP"
+        return "VSTEP"
     elif class_name[2].upper() == "E":
-        class_type = "IELTS"
-    else:
-        class_type = "VSTEP"
+        return "IELTS"
+    return "VSTEP"
 
+def get_class_syllabus(class_type, current_week):
+    """The (at most 3) syllabus rows of current_week for the class type."""
     if class_type == "IELTS":
-        num_week_lesson = ielts_lesson_num
-        total_lesson = total_ielts
         syllabus = ielts_syllabus[ielts_syllabus['Week'] == current_week].copy()
     else:
-        num_week_lesson = vstep_lesson_num
-        total_lesson = total_vstep
         syllabus = vstep_syllabus[vstep_syllabus['Week'] == current_week].copy()
 
     syllabus.columns = syllabus.columns.str.replace('(', '', regex=False).str.replace(')', '', regex=False).str.replace(' ', '_')
@@ -228,174 +221,141 @@ def create_report(class_name, current_week, vstep_lesson_num, ielts_lesson_num,
          
     syllabus = syllabus[['Week','Name','Skill_Focus']]
     syllabus = syllabus.dropna()
-    syllabus = syllabus.head(3)
+    return syllabus.head(3)
+
+def report_file_path(output_dir, current_week, class_name):
+    return f'{output_dir}/W{current_week}-PCT-Report-{class_name}.docx'
+
+def class_fingerprint(class_name, current_week, vstep_lesson_num, ielts_lesson_num, course_vstep, course_ielts,
+                      total_ielts, total_vstep, class_slices, report_date, template_path):
+    """Fingerprint of everything create_report reads for one class."""
+    school_class = class_objects.get(class_name)
+    sessions = []
+    if school_class is not None:
+        sessions = [[number, str(session.time), str(session.teacher)] for number, session in school_class.sessions.items()]
+    return report_manifest.fingerprint(
+        class_name, current_week, vstep_lesson_num, ielts_lesson_num, course_vstep, course_ielts,
+        total_ielts, total_vstep, report_date, sessions,
+        report_manifest.file_signature(template_path) if template_path else None,
+        get_class_syllabus(get_class_type(class_name), current_week),
+        class_slices['all'], class_slices['feedback'],
+    )
+
+def create_report(class_name, current_week, vstep_lesson_num, ielts_lesson_num, data, data_feedback, output_dir, 
+                  course_vstep="Practical English A2-B2", course_ielts="Practical English B2 & IELTS A2-B1",
+                  total_ielts=54, total_vstep=52, class_slices=None, engine=None):
+    template_path = get_template_path()
+    if template_path is None:
+        return None
+    
+    class_type = get_class_type(class_name)
+
+    if class_type == "IELTS":
+        num_week_lesson = ielts_lesson_num
+        total_lesson = total_ielts
+    else:
+        num_week_lesson = vstep_lesson_num
+        total_lesson = total_vstep
+
+    syllabus = get_class_syllabus(class_type, current_week)
+
+    percentage = (num_week_lesson / total_lesson) * 100
+    content = report_render.ReportContent(
+        class_name,
+        course_ielts if class_type == "IELTS" else course_vstep,
+        (datetime.now()).strftime("%d-%m-%Y"),
+        str(current_week),
+        f"{num_week_lesson}/{total_lesson} ({percentage:.2f}%)",
+    )
 
     # Add Class Detail
-    class_data = []
     if class_name in class_objects:
-        school_class = class_objects[class_name]
-        for session_number, session in school_class.sessions.items():
-            class_data.append([class_name, session_number, session.time, session.teacher])
-    
-    df_class_sessions = pd.DataFrame(class_data, columns=['Class', 'Session', 'Time', 'Teacher'])
-    
-    # Fill Session Info
-    for row, (_, data_row) in zip(tables[2].rows[1:], df_class_sessions.iterrows()):
-        session_number = data_row['Session']
-        if session_number in class_objects[class_name].sessions:
-            row.cells[2].text = str(class_objects[class_name].sessions[session_number].time)
-            row.cells[3].text = str(class_objects[class_name].sessions[session_number].teacher)
-
-    # Fill Syllabus Info
-    for row, (_, data_row) in zip(tables[2].rows[1:], syllabus.iterrows()):
-        row.cells[4].text = str(data_row['Name'])
-        row.cells[5].text = str(data_row['Skill_Focus'])
-
-    df = data[data['English_Class_y'] == class_name].copy()
+        for session in class_objects[class_name].sessions.values():
+            content.sessions.append((str(session.time), str(session.teacher)))
+
+    # Add Syllabus Info
+    for _, data_row in syllabus.iterrows():
+        content.syllabus.append((str(data_row['Name']), str(data_row['Skill_Focus'])))
+
+    if class_slices is None:
+        class_slices = partition_by_class(data[data['English_Class_y'] == class_name]).get(class_name) or empty_class_slices(data)
+    df = class_slices['all']
     
     # Feedback Helper
     def add_feedback_local():
-        feedback_class = data_feedback[data_feedback['Class'].str.contains(class_name, na=False)].copy()
+        if 'feedback' in class_slices:
+            feedback_class = class_slices['feedback'].copy()
+        else:
+            feedback_class = data_feedback[data_feedback['Class'].str.contains(class_name, na=False)].copy()
         if feedback_class.empty:
             return []
             
         feedback_class = feedback_class.sort_values(by='Date', ascending=True)
-        student_info = df[['Full_Name', 'Main_Class_y']].dropna()
+        # Built once per class and shared by every comment
+        student_index = StudentNameIndex(df, name_col='Full_Name', class_col='Main_Class_y')
         
         counter = 1
         for idx, feedback in feedback_class.iterrows():
             comment_text = str(feedback['Comments'])
             matches = re.findall(r'"([^"]+)"', comment_text)
             for match in matches:
-                match_lower = match.strip().lower()
-                found_student = student_info[student_info['Full_Name'].str.lower().str.contains(re.escape(match_lower))]
-                if not found_student.empty:
-                    full_name = found_student.iloc[0]['Full_Name']
-                    main_class = found_student.iloc[0]['Main_Class_y']
+                found_student = student_index.find(match)
+                if found_student is not None:
+                    full_name, main_class = found_student
                     new_text = f'{full_name} {main_class}' 
                     comment_text = comment_text.replace(f'"{match}"', new_text)
 
             feedback_class.at[idx, 'Comments'] = comment_text
             
-            new_row = tables[3].add_row()
-            new_row.cells[0].text = str(counter)
-            new_row.cells[1].text = str(feedback['Your_name'])
-            new_row.cells[2].text = str(comment_text)
+            content.feedback_rows.append([str(counter), str(feedback['Your_name']), str(comment_text)])
             counter += 1
-            
-        return feedback_class['Comments'].tolist()
-
-    # Fill Header Info
-    for paragraph in doc.paragraphs:
-        if "Tổng số bài học cho đến thời điểm báo cáo:" in paragraph.text:
-            percentage = (num_week_lesson / total_lesson) * 100
-            paragraph.text += f"{num_week_lesson}/{total_lesson} ({percentage:.2f}%)"
-
-    first_row = tables[1].rows[0]
-    first_row.cells[2].text = class_name
-
-    second_row = tables[1].rows[1]
-    if class_type == "IELTS":
-        second_row.cells[2].text = course_ielts
-    else:
-        second_row.cells[2].text = course_vstep
-
-    third_row = tables[1].rows[2]
-    third_row.cells[2].text = (datetime.now()).strftime("%d-%m-%Y")
 
-    for row in (first_row.cells[2],second_row.cells[2],third_row.cells[2]):
-        for paragraph in row.paragraphs:
-            paragraph.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-
-    tables[2].rows[1].cells[0].text = str(current_week)
-    for paragraph in tables[2].rows[1].cells[0].paragraphs:
-        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        return feedback_class['Comments'].tolist()
 
     # Student Lists
-    late_students = df[df['Status'] == 'late'].sort_values(by='Unitslessons_Passed', ascending=False)
-    keep_up_students = df[df['Status'] == 'keep up'].sort_values(by='Unitslessons_Passed', ascending=False)
-    far_away_students = df[df['Status'] == 'far away'].sort_values(by='Unitslessons_Passed', ascending=False)
+    late_students = class_slices['late']
+    keep_up_students = class_slices['keep up']
+    far_away_students = class_slices['far away']
 
-    def add_students(table, students):
+    def add_students(rows, students):
         # Determine which Main Class column name to use (after cleaning spaces to _)
         main_class_col = 'Main_Class_y' if 'Main_Class_y' in students.columns else 'Main_Class'
         columns = ['Full_Name', main_class_col, 'Progress', 'Study_Time', 'Unitslessons_Passed', 'Unitslessons_Studied', 'Average_time_per_lesson']
         counter = 1
-        for _, row in students.iterrows():
+        for row in students.to_dict('records'):
             try:
-                new_row = table.add_row()
-                new_row.cells[0].text = str(counter)
-                for i, col in enumerate(columns):
-                    if i + 1 < len(new_row.cells):
-                        val = row[col]
-                        new_row.cells[i + 1].text = str(val) if pd.notna(val) else "N/A"
-                counter += 1
+                values = [str(row[col]) if pd.notna(row[col]) else "N/A" for col in columns]
             except Exception as e:
                 print(f"Error adding student row: {e}")
                 continue
+            rows.append([str(counter)] + values)
+            counter += 1
 
-    add_students(tables[4], far_away_students)    
-    add_students(tables[5], keep_up_students)  
-    add_students(tables[6], late_students)  
+    add_students(content.student_rows[4], far_away_students)
+    add_students(content.student_rows[5], keep_up_students)
+    add_students(content.student_rows[6], late_students)
 
-    def add_warning_students(table, students):
-        counter = 1
-        for _, row in students.iterrows():
-            new_row = table.add_row()
-            new_row.cells[0].text = str(counter)
-            new_row.cells[1].text = str(row['Full_Name'])
-            main_class_col = 'Main_Class_y' if 'Main_Class_y' in students.columns else 'Main_Class'
-            if main_class_col in row:
-                new_row.cells[2].text = str(row[main_class_col])
-            else:
-                new_row.cells[2].text = "N/A"
+    def add_warning_students(rows, students):
+        main_class_col = 'Main_Class_y' if 'Main_Class_y' in students.columns else 'Main_Class'
+        for counter, row in enumerate(students.to_dict('records'), start=1):
+            main_class = str(row[main_class_col]) if main_class_col in row else "N/A"
             avg_time = str(row['Average_time_per_lesson'])
-            new_row.cells[3].text = f"Thời gian trung bình làm bài quá ngắn ({avg_time})"
-            counter += 1
+            rows.append([str(counter), str(row['Full_Name']), main_class,
+                         f"Thời gian trung bình làm bài quá ngắn ({avg_time})"])
 
     # Filter Warning Students (Avg time < 10 mins)
-    def check_warning_time(x):
-        try:
-            if isinstance(x, str) and 'phút' in x:
-                val = float(x.split()[0])
-                return val < 10 and val > 0 # Ignore 0 as it might be no study? User logic said < 10. User snippet just < 10.
-            return False
-        except:
-            return False
-
     # User snippet simplified check: float(x.split()[0]) < 10. '0 phút' is < 10.
-    warning_students = df[df['Average_time_per_lesson'].apply(
-        lambda x: float(x.split()[0]) < 10 if isinstance(x, str) and len(x.split()) > 0 and x.split()[0].replace('.','',1).isdigit() else False
-    )].sort_values(by='Average_time_per_lesson', ascending=True)
-
-    if len(tables) > 7:
-        add_warning_students(tables[7], warning_students)  
-
-    # Process Feedback Paragraph
-    for paragraph in doc.paragraphs:
-        if "Tóm tắt tình hình lớp:" in paragraph.text:
-            add_feedback_local()
-
-    # Font Styling
-    for paragraph in doc.paragraphs:
-        for run in paragraph.runs:
-            run.font.name = 'Arial'
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Arial')
-            run.font.size = Pt(12)
-
-    for table in doc.tables[:4]:
-        for row in table.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.name = 'Arial'
-                        run._element.rPr.rFonts.set(qn('w:eastAsia'), 'Arial')
-                        run.font.size = Pt(11)   
+    warning_students = df[df['Average_time_per_lesson_Minutes'] < 10].sort_values(by='Average_time_per_lesson', ascending=True)
+
+    add_warning_students(content.warning_rows, warning_students)
+
+    # Feedback table
+    add_feedback_local()
 
     # Save
-    file_path = f'{output_dir}/W{current_week}-PCT-Report-{class_name}.docx'
+    file_path = report_file_path(output_dir, current_week, class_name)
     try:
-        doc.save(file_path)
+        report_render.render(content, template_path, file_path, engine)
         return file_path
     except Exception as e:
         print(f"Error saving {file_path}: {e}")
@@ -403,39 +363,136 @@ def create_report(class_name, current_week, vstep_lesson_num, ielts_lesson_num,
 
 def generate_grade_11_reports(current_week, vstep_lesson_num, ielts_lesson_num, data_file_path, output_dir=None, 
                               target_classes_list=None, course_vstep="Practical English A2-B2", course_ielts="Practical English B2 & IELTS A2-B1",
-                              total_ielts=54, total_vstep=52, timesheet_path=None):
+                              total_ielts=54, total_vstep=52, timesheet_path=None, workers=None, feedback_by_class=None, engine=None, progress=None, incremental=None):
     if output_dir is None:
         output_dir = os.path.join(BASE_DIR, 'Grade_11', f'Grade_11_Week {current_week}')
     
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    engine = report_render.get_engine(engine)
+
+    # progress(event, **fields) is an optional observer: 'stage' before each step,
+    # 'stats' once they are computed, 'render' with the class count, 'class' per report,
+    # 'timing' with the seconds spent in each stage once it has ended
+    spans = metrics.StageSpans('Grade_11', lambda stage, seconds: notify('timing', stage=stage, seconds=seconds))
+
+    def notify(event, **fields):
+        if event == 'stage':
+            spans.start(fields['stage'])
+        if progress is not None:
+            progress(event, **fields)
+
     # Use default classes if none provided
     if not target_classes_list:
         target_classes_list = classes  # Fallback to global if needed
 
     # Load Data
-    excel_file = pd.read_excel(data_file_path)
-    
-    # Clean and Process
-    data = clean_data(excel_file, list_11)
+    # An identical export submitted before is served cleaned from the upload cache
+    notify('stage', stage='read_export')
+    data = upload_cache.lookup(data_file_path, 'grade_11')
+    if data is None:
+        excel_file = export_reader.read_platform_export(data_file_path)
+        metrics.ROWS_PROCESSED.observe(len(excel_file), group='Grade_11', stage='read_export')
+
+        # Clean and Process
+        notify('stage', stage='clean_data')
+        data = clean_data(excel_file, list_11)
+        upload_cache.store(data_file_path, 'grade_11', data)
+    metrics.ROWS_PROCESSED.observe(len(data), group='Grade_11', stage='clean_data')
+
+    spans.start('add_contribute')
     add_contribute_to_dataframe(data, ielts_lesson_num, vstep_lesson_num)
     
-    # Get Feedback Data
-    data_feedback = get_processed_feedback(target_classes_list, feedback_path=timesheet_path)
+    # Get Feedback Data (the caller may pass the timesheet already parsed and split by class)
+    if feedback_by_class is None:
+        notify('stage', stage='feedback')
+        data_feedback = get_processed_feedback(target_classes_list, feedback_path=timesheet_path)
+        feedback_by_class = timesheet.partition_by_class(data_feedback, target_classes_list)
 
     generated_files = []
     
     # Calculate Stats
+    notify('stage', stage='stats')
     stats = analysis.calculate_stats(data)
+    notify('stats', stats=stats)
 
     for class_name in target_classes_list:
         # Check if class name format is valid (needed for class_objects lookup or simple object creation)
         if class_name not in class_objects:
              print(f"Warning: Class {class_name} not found in session config. Report will lack session details.")
-        
-        path = create_report(class_name, current_week, vstep_lesson_num, ielts_lesson_num, data, data_feedback, output_dir, course_vstep, course_ielts, total_ielts, total_vstep)
+
+    # Split by class and status once; each report gets its slices by lookup
+    spans.start('partition')
+    partitions = partition_by_class(data)
+    empty_feedback = pd.DataFrame(columns=timesheet.FEEDBACK_COLUMNS)
+    class_slices_by_name = {}
+    for class_name in target_classes_list:
+        class_slices = dict(partitions.get(class_name) or empty_class_slices(data))
+        class_slices['feedback'] = feedback_by_class.get(class_name, empty_feedback)
+        class_slices_by_name[class_name] = class_slices
+
+    # Reuse reports whose inputs match the last run in this week directory
+    spans.start('fingerprint')
+    incremental = report_manifest.incremental_enabled(incremental)
+    manifest = report_manifest.load(output_dir)
+    template_path = get_template_path()
+    report_date = (datetime.now()).strftime("%d-%m-%Y")
+    fingerprints = {}
+    reused = {}
+    for class_name in target_classes_list:
+        fingerprints[class_name] = class_fingerprint(class_name, current_week, vstep_lesson_num, ielts_lesson_num, course_vstep, course_ielts,
+                                                     total_ielts, total_vstep, class_slices_by_name[class_name], report_date, template_path)
+        path = report_file_path(output_dir, current_week, class_name)
+        if incremental and report_manifest.is_current(manifest, class_name, fingerprints[class_name], path):
+            reused[class_name] = path
+    pending_classes = [class_name for class_name in target_classes_list if class_name not in reused]
+
+    notify('stage', stage='render')
+    notify('render', total=len(target_classes_list))
+
+    def class_done(class_name, path, error=None, reused=False):
+        notify('class', className=class_name, file=os.path.basename(path) if path else None, error=error, reused=reused)
+
+    for class_name, path in reused.items():
+        class_done(class_name, path, reused=True)
+
+    results = dict(reused)
+    workers = parallel_render.get_worker_count(workers)
+    if workers > 1 and len(pending_classes) > 1:
+        # Parallel mode: each worker only receives its own class's rows and feedback
+        class_jobs = []
+        for class_name in pending_classes:
+            class_slices = class_slices_by_name[class_name]
+            class_jobs.append((class_name, (class_name, current_week, vstep_lesson_num, ielts_lesson_num, class_slices['all'], class_slices['feedback'], output_dir, course_vstep, course_ielts, total_ielts, total_vstep, class_slices, engine)))
+
+        rendered, failures = parallel_render.render_classes(create_report, class_jobs, workers, on_done=class_done)
+        results.update(rendered)
+
+        if failures:
+            print(f"Warning: {len(failures)} class report(s) failed: {failures}")
+            if stats is not None:
+                stats['failed_classes'] = failures
+    else:
+        for class_name in pending_classes:
+            class_slices = class_slices_by_name[class_name]
+            path = create_report(class_name, current_week, vstep_lesson_num, ielts_lesson_num, data, class_slices['feedback'], output_dir, course_vstep, course_ielts, total_ielts, total_vstep, class_slices, engine)
+            class_done(class_name, path)
+            results[class_name] = path
+
+    for class_name in target_classes_list:
+        path = results.get(class_name)
         if path:
             generated_files.append(path)
-            
+            manifest[class_name] = report_manifest.entry(fingerprints[class_name], path)
+        else:
+            manifest.pop(class_name, None)
+    report_manifest.save(output_dir, manifest)
+    spans.finish()
+
+    rendered_files = [results[class_name] for class_name in pending_classes if results.get(class_name)]
+    metrics.record_reports('Grade_11', rendered_files, len(reused), len(pending_classes) - len(rendered_files))
+
+    if stats is not None:
+        stats['reused_reports'] = [os.path.basename(reused[class_name]) for class_name in target_classes_list if class_name in reused]
     return generated_files, stats
@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import pandas as pd
+
+# Incremental regeneration. Each week directory keeps a manifest of the fingerprint of
+# every class report's inputs (student and feedback slices, syllabus rows, session
+# config, week, lesson counts, template...). A report whose fingerprint matches the last
+# run, and whose file is still the one that run wrote, is reused instead of re-rendered.
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '.report_manifest.json'
+# Bump when report content changes for the same inputs, so old reports are rebuilt
+MANIFEST_VERSION = 1
+
+
+def incremental_enabled(incremental=None):
+    if incremental is None:
+        return os.environ.get('PCT_INCREMENTAL', '1').lower() not in ('0', 'false', 'no')
+    return bool(incremental)
+
+
+def frame_digest(df):
+    """Content hash of a DataFrame: column names, dtypes and row values (index ignored)."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:
+        # Unhashable cells (lists, dicts): fall back to their text form
+        row_hashes = pd.util.hash_pandas_object(df.astype(str), index=False)
+    digest.update(row_hashes.values.tobytes())
+    return digest.hexdigest()
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def fingerprint(*parts):
+    """Hash of the given inputs; DataFrames are hashed by content, everything else by its JSON/str form."""
+    digest = hashlib.sha256(str(MANIFEST_VERSION).encode('utf-8'))
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            text = frame_digest(part)
+        else:
+            text = json.dumps(part, sort_keys=True, ensure_ascii=False, default=str)
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def load(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('classes', {})
+
+
+def is_current(manifest, class_name, class_fingerprint, file_path):
+    """True if the report at file_path was written by a run with the same inputs."""
+    entry = manifest.get(class_name)
+    if not entry or entry.get('fingerprint') != class_fingerprint:
+        return False
+    if entry.get('file') != os.path.basename(file_path) or not os.path.exists(file_path):
+        return False
+    return entry.get('signature') == file_signature(file_path)
+
+
+def entry(class_fingerprint, file_path):
+    return {'fingerprint': class_fingerprint, 'file': os.path.basename(file_path), 'signature': file_signature(file_path)}
+
+
+def save(output_dir, classes):
+    """Writes the manifest atomically, so a crashed run never leaves a half-written file."""
+    data = {'version': MANIFEST_VERSION, 'classes': classes}
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix='.manifest-', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+    except OSError as e:
+        logger.warning(f"Could not write report manifest in {output_dir}: {e}")
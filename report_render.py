@@ -0,0 +1,151 @@
+import os
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt
+import docx_template
+import xml_template
+
+# Writes a prepared ReportContent into the Word template. Two engines produce
+# equivalent documents:
+#   'docx' - python-docx object model (default)
+#   'xml'  - direct edits of word/document.xml, see xml_template
+# The engine is chosen per run (generate_* engine=...) or with PCT_RENDER_ENGINE.
+
+ENGINE_DOCX = 'docx'
+ENGINE_XML = 'xml'
+ENGINES = (ENGINE_DOCX, ENGINE_XML)
+
+LESSON_SUMMARY_MARKER = "Tổng số bài học cho đến thời điểm báo cáo:"
+FEEDBACK_MARKER = "Tóm tắt tình hình lớp:"
+
+# Runs that get the report fonts, as w:-prefixed XPath that both engines' set_run_fonts accept.
+# BODY_RUNS: the runs reached by doc.paragraphs -> runs.
+BODY_RUNS = './w:body/w:p/w:r'
+# HEADER_TABLE_RUNS: doc.tables[:4] -> rows -> cells -> paragraphs -> runs. row.cells resolves a
+# vertically merged continuation cell to the cell above, so those cells are never visited.
+HEADER_TABLE_RUNS = ("./w:body/w:tbl[position() <= 4]/w:tr"
+                     "/w:tc[not(w:tcPr/w:vMerge[not(@w:val) or @w:val='continue'])]/w:p/w:r")
+
+
+def get_engine(engine=None):
+    if engine is None:
+        engine = os.environ.get('PCT_RENDER_ENGINE') or ENGINE_DOCX
+    engine = engine.strip().lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown render engine '{engine}' (expected one of {', '.join(ENGINES)})")
+    return engine
+
+
+class ReportContent:
+    """Everything create_report writes into the template, already formatted as text."""
+
+    def __init__(self, class_name, course, report_date, week, lesson_summary):
+        self.class_name = class_name
+        self.course = course
+        self.report_date = report_date
+        self.week = week
+        self.lesson_summary = lesson_summary
+        self.sessions = []        # (time, teacher) for table 2, rows 1..
+        self.syllabus = []        # (name, skill focus) for table 2, rows 1..
+        self.feedback_rows = []   # table 3
+        self.student_rows = {4: [], 5: [], 6: []}  # far away, keep up, late
+        self.warning_rows = []    # table 7
+
+
+def render_docx(content, template_path, file_path):
+    doc = docx_template.open_template(template_path)
+    tables = doc.tables
+
+    # Session and syllabus info
+    for row, (time, teacher) in zip(tables[2].rows[1:], content.sessions):
+        row.cells[2].text = time
+        row.cells[3].text = teacher
+    for row, (name, skill_focus) in zip(tables[2].rows[1:], content.syllabus):
+        row.cells[4].text = name
+        row.cells[5].text = skill_focus
+
+    for paragraph in doc.paragraphs:
+        if LESSON_SUMMARY_MARKER in paragraph.text:
+            paragraph.text += content.lesson_summary
+
+    header_cells = []
+    for row, text in zip(tables[1].rows[:3], (content.class_name, content.course, content.report_date)):
+        row.cells[2].text = text
+        header_cells.append(row.cells[2])
+    for cell in header_cells:
+        for paragraph in cell.paragraphs:
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+
+    tables[2].rows[1].cells[0].text = content.week
+    for paragraph in tables[2].rows[1].cells[0].paragraphs:
+        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    for index, rows in content.student_rows.items():
+        docx_template.add_rows(tables[index], rows)
+    if len(tables) > 7:
+        docx_template.add_rows(tables[7], content.warning_rows)
+
+    for paragraph in doc.paragraphs:
+        if FEEDBACK_MARKER in paragraph.text:
+            docx_template.add_rows(tables[3], content.feedback_rows)
+
+    docx_template.set_run_fonts(doc, BODY_RUNS, 'Arial', Pt(12))
+    docx_template.set_run_fonts(doc, HEADER_TABLE_RUNS, 'Arial', Pt(11))
+
+    doc.save(file_path)
+
+
+def render_xml(content, template_path, file_path):
+    entries, root = xml_template.open_template(template_path)
+    body = root.find(xml_template.w('body'))
+    paragraphs = body.findall(xml_template.w('p'))
+    tables = body.findall(xml_template.w('tbl'))
+
+    def rows(table):
+        return table.findall(xml_template.w('tr'))
+
+    for tr, (time, teacher) in zip(rows(tables[2])[1:], content.sessions):
+        cells = xml_template.row_cells(tr)
+        xml_template.set_cell_text(cells[2], time)
+        xml_template.set_cell_text(cells[3], teacher)
+    for tr, (name, skill_focus) in zip(rows(tables[2])[1:], content.syllabus):
+        cells = xml_template.row_cells(tr)
+        xml_template.set_cell_text(cells[4], name)
+        xml_template.set_cell_text(cells[5], skill_focus)
+
+    for p in paragraphs:
+        text = xml_template.paragraph_text(p)
+        if LESSON_SUMMARY_MARKER in text:
+            xml_template.set_paragraph_text(p, text + content.lesson_summary)
+
+    header_cells = []
+    for tr, text in zip(rows(tables[1])[:3], (content.class_name, content.course, content.report_date)):
+        cell = xml_template.row_cells(tr)[2]
+        xml_template.set_cell_text(cell, text)
+        header_cells.append(cell)
+    for cell in header_cells:
+        xml_template.align_cell(cell, 'right')
+
+    week_cell = xml_template.row_cells(rows(tables[2])[1])[0]
+    xml_template.set_cell_text(week_cell, content.week)
+    xml_template.align_cell(week_cell, 'center')
+
+    for index, student_rows in content.student_rows.items():
+        xml_template.add_rows(tables[index], student_rows)
+    if len(tables) > 7:
+        xml_template.add_rows(tables[7], content.warning_rows)
+
+    for p in paragraphs:
+        if FEEDBACK_MARKER in xml_template.paragraph_text(p):
+            xml_template.add_rows(tables[3], content.feedback_rows)
+
+    xml_template.set_run_fonts(root, BODY_RUNS, 'Arial', 24)
+    xml_template.set_run_fonts(root, HEADER_TABLE_RUNS, 'Arial', 22)
+
+    xml_template.save(entries, root, file_path)
+
+
+def render(content, template_path, file_path, engine=None):
+    if get_engine(engine) == ENGINE_XML:
+        render_xml(content, template_path, file_path)
+    else:
+        render_docx(content, template_path, file_path)
@@ -70,26 +70,21 @@ document.addEventListener('DOMContentLoaded', () => {
 
         const formData = new FormData(form);
         try {
-            const response = await fetch('/generate', { method: 'POST', body: formData });
-            const text = await response.text();
-
-            try {
-                const result = JSON.parse(text);
-                if (result.success) {
-                    showToast(result.message, 'success');
-                    displayResults(result);
-                } else {
-                    showToast(result.message, 'error');
-                }
-            } catch (e) {
-                console.error("JSON Parse Error:", e);
-                console.log("Raw Response:", text);
-                showToast('Lỗi cấu trúc dữ liệu JSON. Kiểm tra Console để xem chi tiết.', 'error');
+            const result = await generateReports(formData);
+            if (result.success) {
+                showToast(result.message, 'success');
+                displayResults(result);
+            } else {
+                showToast(result.message, 'error');
             }
-
         } catch (error) {
-            console.error("Fetch Error:", error);
-            showToast(`Lỗi kết nối: ${error.message}`, 'error');
+            if (error instanceof SyntaxError) {
+                console.error("JSON Parse Error:", error);
+                showToast('Lỗi cấu trúc dữ liệu JSON. Kiểm tra Console để xem chi tiết.', 'error');
+            } else {
+                console.error("Fetch Error:", error);
+                showToast(`Lỗi kết nối: ${error.message}`, 'error');
+            }
         } finally {
             btnText.textContent = 'Tạo Báo Cáo';
             loader.style.display = 'none';
@@ -97,40 +92,155 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    async function readJSON(response) {
+        const text = await response.text();
+        try {
+            return JSON.parse(text);
+        } catch (e) {
+            console.log("Raw Response:", text);
+            throw e;
+        }
+    }
+
+    // Streams generation over server-sent events so reports show up as each class finishes.
+    // Browsers without streaming fetch use the job API instead.
+    async function generateReports(formData) {
+        if (window.ReadableStream && window.TextDecoder) {
+            const response = await fetch('/generate/stream', { method: 'POST', body: formData });
+            if (response.ok && response.body) {
+                return streamReports(response);
+            }
+        }
+        return pollReportJob(formData);
+    }
+
+    async function streamReports(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const liveStats = {};
+        let buffer = '';
+        let started = false;
+        let received = 0;
+
+        const startResults = (week10, week11) => {
+            if (started) return;
+            started = true;
+            list10.innerHTML = '';
+            list11.innerHTML = '';
+            weekDisplay.textContent = `Tuần ${week10 ?? '...'} & ${week11 ?? '...'}`;
+            resultsSection.style.display = 'block';
+        };
+
+        const handleEvent = (event, data) => {
+            if (event === 'stats') {
+                liveStats[data.grade] = data.stats;
+                displayDashboard(liveStats.Grade_10, liveStats.Grade_11);
+                document.getElementById('dashboardSection').style.display = 'block';
+            } else if (event === 'report') {
+                startResults(formWeek('week_10'), formWeek('week_11'));
+                const list = data.grade === 'Grade_10' ? list10 : list11;
+                list.appendChild(createReportCard(data.filename, data.grade, data.week, data.reused));
+                received += 1;
+                btnText.textContent = `Đang xử lý... ${received} báo cáo`;
+            } else if (event === 'report_failed') {
+                console.warn(`Report for ${data.className} failed:`, data.error);
+            }
+        };
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                const dataLines = [];
+                block.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+                });
+                if (!dataLines.length) continue; // keep-alive comment
+
+                const data = JSON.parse(dataLines.join('\n'));
+                if (event === 'done') return data;
+                handleEvent(event, data);
+            }
+        }
+        throw new Error('Kết nối bị ngắt trước khi tạo xong báo cáo');
+    }
+
+    function formWeek(name) {
+        return form.elements[name] ? form.elements[name].value : null;
+    }
+
+    // Runs generation as a background job and polls its progress.
+    // Falls back to the blocking /generate when the server has jobs disabled.
+    async function pollReportJob(formData) {
+        const submitted = await fetch('/generate/jobs', { method: 'POST', body: formData });
+        if (submitted.status === 503 || submitted.status === 404) {
+            return readJSON(await fetch('/generate', { method: 'POST', body: formData }));
+        }
+
+        const job = await readJSON(submitted);
+        if (!job.success) return job;
+
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            const status = await readJSON(await fetch(job.statusUrl));
+            if (status.status === 'done' || status.status === 'failed') {
+                return status.result || { success: false, message: status.message || 'Lỗi tạo báo cáo' };
+            }
+            showProgress(status);
+        }
+    }
+
+    function showProgress(status) {
+        const grades = Object.values(status.classes || {});
+        const total = grades.reduce((sum, grade) => sum + grade.total, 0);
+        const finished = grades.reduce((sum, grade) => sum + grade.done + grade.failed, 0);
+        btnText.textContent = total ? `Đang xử lý... ${finished}/${total} báo cáo` : 'Đang xử lý...';
+    }
+
+    function createReportCard(filename, grade, week, reused = false) {
+        const li = document.createElement('li');
+        li.className = 'report-card';
+        li.innerHTML = `
+            <div class="card-info">
+                <i class="fa-solid fa-file-word icon"></i>
+                <div class="details">
+                    <span class="filename" title="${filename}">${filename}</span>
+                    <span class="filesize">Khối ${grade.split('_')[1]}${reused ? ' · Không thay đổi' : ''}</span>
+                </div>
+            </div>
+            <div class="card-actions">
+                <button class="action-btn preview-btn" data-grade="${grade}" data-week="${week}" data-file="${filename}" title="Xem trước">
+                    <i class="fa-solid fa-eye"></i>
+                </button>
+                <a href="/download/${grade}/${week}/${filename}" class="action-btn download-btn" title="Tải xuống">
+                    <i class="fa-solid fa-download"></i>
+                </a>
+            </div>
+        `;
+        // Attach listener directly to the preview button
+        li.querySelector('.preview-btn').onclick = function () {
+            openPreview(this.dataset.grade, this.dataset.week, this.dataset.file);
+        };
+        return li;
+    }
+
     function displayResults(data) {
         list10.innerHTML = '';
         list11.innerHTML = '';
         weekDisplay.textContent = `Tuần ${data.week_10} & ${data.week_11}`;
 
-        const createReportCard = (filename, grade, week) => {
-            const li = document.createElement('li');
-            li.className = 'report-card';
-            li.innerHTML = `
-                <div class="card-info">
-                    <i class="fa-solid fa-file-word icon"></i>
-                    <div class="details">
-                        <span class="filename" title="${filename}">${filename}</span>
-                        <span class="filesize">Khối ${grade.split('_')[1]}</span>
-                    </div>
-                </div>
-                <div class="card-actions">
-                    <button class="action-btn preview-btn" data-grade="${grade}" data-week="${week}" data-file="${filename}" title="Xem trước">
-                        <i class="fa-solid fa-eye"></i>
-                    </button>
-                    <a href="/download/${grade}/${week}/${filename}" class="action-btn download-btn" title="Tải xuống">
-                        <i class="fa-solid fa-download"></i>
-                    </a>
-                </div>
-            `;
-            // Attach listener directly to the preview button
-            li.querySelector('.preview-btn').onclick = function () {
-                openPreview(this.dataset.grade, this.dataset.week, this.dataset.file);
-            };
-            return li;
-        };
-
-        data.reports_10.forEach(f => list10.appendChild(createReportCard(f, 'Grade_10', data.week_10)));
-        data.reports_11.forEach(f => list11.appendChild(createReportCard(f, 'Grade_11', data.week_11)));
+        const reused10 = new Set(data.reused_10 || []);
+        const reused11 = new Set(data.reused_11 || []);
+        data.reports_10.forEach(f => list10.appendChild(createReportCard(f, 'Grade_10', data.week_10, reused10.has(f))));
+        data.reports_11.forEach(f => list11.appendChild(createReportCard(f, 'Grade_11', data.week_11, reused11.has(f))));
 
         // Dashboard
         if (data.stats_10 || data.stats_11) {
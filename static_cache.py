@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import hashlib
+import logging
+import pandas as pd
+import private_tmp
+
+# Parsed copies of the bundled workbooks (StudentList, syllabi) live here.
+# The deploy build pre-populates CACHE_DIR; at runtime the function bundle may be
+# read-only, so freshly parsed workbooks fall back to a temp directory instead.
+# Entries may be pickles, so the fallback is per user and only used while it is private
+# (see private_tmp): anyone who could write there could run code on load.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get('PCT_STATIC_CACHE_DIR', os.path.join(BASE_DIR, '.static_cache'))
+FALLBACK_CACHE_DIR = private_tmp.user_temp_path('pct_static_cache')
+
+# Workbooks loaded at import time by report_grade_10 / report_grade_11
+STATIC_FILES = [
+    'StudentList10.xlsx',
+    'StudentList11.xlsx',
+    'IELTS_syllabus_10.xlsx',
+    'IELTS_syllabus_11.xlsx',
+    'VSTEP_syllabus_10.xlsx',
+    'VSTEP_syllabus_11.xlsx',
+]
+
+CACHE_VERSION = 1
+
+
+def _cache_key(path):
+    """Stable key for a source file: its path relative to the project root."""
+    abs_path = os.path.abspath(path)
+    try:
+        rel = os.path.relpath(abs_path, BASE_DIR)
+    except ValueError:
+        rel = abs_path
+    if rel.startswith('..'):
+        rel = abs_path
+    return rel.replace(os.sep, '__').replace(':', '').replace(' ', '_')
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_dirs(create=False):
+    dirs = [CACHE_DIR]
+    fallback = private_tmp.private_dir(FALLBACK_CACHE_DIR, create)
+    if fallback is not None:
+        dirs.append(fallback)
+    return dirs
+
+
+def _read_manifest(cache_dir, key):
+    try:
+        with open(os.path.join(cache_dir, f'{key}.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != CACHE_VERSION:
+            return None
+        return manifest
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(cache_dir, key, manifest):
+    tmp_path = os.path.join(cache_dir, f'{key}.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(cache_dir, f'{key}.json'))
+
+
+def _load_frame(cache_dir, manifest):
+    data_path = os.path.join(cache_dir, manifest['data_file'])
+    if manifest['format'] == 'parquet':
+        return pd.read_parquet(data_path)
+    return pd.read_pickle(data_path)
+
+
+def _store_frame(cache_dir, key, df):
+    """Write df as Parquet, or pickle when pyarrow is missing or the columns are mixed-type."""
+    try:
+        data_file = f'{key}.parquet'
+        tmp_path = os.path.join(cache_dir, data_file + '.tmp')
+        df.to_parquet(tmp_path, index=False)
+        fmt = 'parquet'
+    except Exception:
+        data_file = f'{key}.pkl'
+        tmp_path = os.path.join(cache_dir, data_file + '.tmp')
+        df.to_pickle(tmp_path)
+        fmt = 'pickle'
+    os.replace(tmp_path, os.path.join(cache_dir, data_file))
+    return data_file, fmt
+
+
+def _lookup(cache_dir, key, stat, path, content_hash=None):
+    """
+    Returns (df, manifest, content_hash) when cache_dir holds a valid entry for path.
+    mtime+size is the fast path; when it differs (e.g. after a fresh checkout) the
+    content hash decides whether the entry can still be reused.
+    """
+    manifest = _read_manifest(cache_dir, key)
+    if manifest is None:
+        return None, None, content_hash
+
+    fresh = manifest.get('mtime_ns') == stat.st_mtime_ns and manifest.get('size') == stat.st_size
+    if not fresh:
+        if content_hash is None:
+            content_hash = file_sha256(path)
+        fresh = manifest.get('sha256') == content_hash
+    if not fresh:
+        return None, None, content_hash
+
+    try:
+        return _load_frame(cache_dir, manifest), manifest, content_hash
+    except Exception as e:
+        logging.warning(f"Static cache entry for {key} unreadable, rebuilding: {e}")
+        return None, None, content_hash
+
+
+def _store(key, path, stat, content_hash, df):
+    manifest = {
+        'version': CACHE_VERSION,
+        'source': os.path.relpath(os.path.abspath(path), BASE_DIR),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': content_hash,
+    }
+    for cache_dir in (CACHE_DIR, FALLBACK_CACHE_DIR):
+        if cache_dir == FALLBACK_CACHE_DIR and private_tmp.private_dir(FALLBACK_CACHE_DIR, create=True) is None:
+            # Never write pickles where another user could replace them
+            break
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            manifest['data_file'], manifest['format'] = _store_frame(cache_dir, key, df)
+            _write_manifest(cache_dir, key, manifest)
+            return cache_dir
+        except OSError:
+            continue
+    logging.warning(f"Static cache not writable, {key} will be re-parsed on next start")
+    return None
+
+
+def read_excel_cached(path, **read_kwargs):
+    """
+    pd.read_excel(path) backed by the persistent parsed-workbook cache.
+    The entry is rebuilt automatically whenever the workbook content changes.
+    """
+    key = _cache_key(path)
+    if read_kwargs:
+        key += '.' + hashlib.sha1(repr(sorted(read_kwargs.items())).encode()).hexdigest()[:10]
+    stat = os.stat(path)
+
+    content_hash = None
+    for cache_dir in _cache_dirs():
+        df, manifest, content_hash = _lookup(cache_dir, key, stat, path, content_hash)
+        if df is not None:
+            if manifest.get('mtime_ns') != stat.st_mtime_ns:
+                # Same content, new mtime: refresh so the next start takes the fast path
+                try:
+                    manifest['mtime_ns'] = stat.st_mtime_ns
+                    _write_manifest(cache_dir, key, manifest)
+                except OSError:
+                    pass
+            return df
+
+    df = pd.read_excel(path, **read_kwargs)
+    if content_hash is None:
+        content_hash = file_sha256(path)
+    _store(key, path, stat, content_hash, df)
+    return df
+
+
+def build_cache(names=None):
+    """Pre-populates CACHE_DIR for the bundled workbooks. Run at deploy time."""
+    built = []
+    for name in names or STATIC_FILES:
+        path = os.path.join(BASE_DIR, name)
+        if not os.path.exists(path):
+            logging.warning(f"Skipping missing static file: {path}")
+            continue
+        key = _cache_key(path)
+        stat = os.stat(path)
+        df, _, content_hash = _lookup(CACHE_DIR, key, stat, path)
+        if df is None:
+            df = pd.read_excel(path)
+            _store(key, path, stat, content_hash or file_sha256(path), df)
+        built.append(name)
+    return built
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    names = sys.argv[1:] or None
+    for name in build_cache(names):
+        logging.info(f"Cached {name} -> {CACHE_DIR}")
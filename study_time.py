@@ -0,0 +1,65 @@
+import math
+import numbers
+import datetime
+import numpy as np
+import pandas as pd
+
+# Study Time parsing shared by clean_data, the report columns and the dashboard stats.
+# clean_data stores the result once as the integer 'Study_Time_Minutes' column; later stages
+# read that column instead of parsing the text again.
+#
+# Accepted cells, all reduced to whole minutes (seconds are dropped):
+#   'H:MM' / 'H:MM:SS' text (spaces around the parts allowed)
+#   datetime.time and timedelta values, as openpyxl returns for Excel time/duration cells
+#   plain numbers, taken as minutes
+# Anything else (blank, other text, negative values) is <NA>.
+
+MINUTES_COLUMN = 'Study_Time_Minutes'
+TIME_PATTERN = r'^\s*(\d+)\s*:\s*(\d+)\s*(?::\s*\d+\s*)*$'
+
+
+def _cell_minutes(value):
+    """Minutes for one non-text cell, or None."""
+    if isinstance(value, (bool, np.bool_)):
+        return None
+    if isinstance(value, datetime.timedelta):
+        minutes = value.total_seconds() // 60
+    elif isinstance(value, datetime.time):
+        minutes = value.hour * 60 + value.minute
+    elif isinstance(value, numbers.Real):
+        if math.isnan(value) or math.isinf(value):
+            return None
+        minutes = math.floor(value)
+    else:
+        return None
+    return minutes if minutes >= 0 else None
+
+
+def to_minutes(values):
+    """Whole minutes of a Study Time column as an Int64 Series (same index), <NA> where unparseable."""
+    minutes = pd.Series(np.nan, index=values.index)
+    if values.empty:
+        return minutes.astype('Int64')
+
+    if pd.api.types.is_timedelta64_dtype(values):
+        minutes = values.dt.total_seconds() // 60
+    elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        minutes = np.floor(values.astype(float))
+    else:
+        try:
+            parts = values.str.extract(TIME_PATTERN)
+            minutes = parts[0].astype(float) * 60 + parts[1].astype(float)
+        except AttributeError:
+            # .str needs at least some text; a column of Excel time values has none
+            pass
+
+        # Non-text cells (Excel times, durations, numbers) are parsed once per distinct value
+        other = (minutes.isna() & values.notna()).to_numpy()
+        if other.any():
+            codes, uniques = pd.factorize(values[other])
+            parsed = np.array([_cell_minutes(value) for value in uniques], dtype=float)
+            filled = minutes.to_numpy(dtype=float, copy=True)
+            filled[other] = parsed[codes]
+            minutes = pd.Series(filled, index=values.index)
+
+    return minutes.where(minutes >= 0).astype('Int64')
@@ -0,0 +1,51 @@
+import os
+import zipfile
+import pytest
+import report_render
+import report_grade_10
+import report_grade_11
+import timesheet
+import verify_render_engines as verify
+
+# Both engines must write the same word/document.xml for every sample class, including the
+# teacher comments table, so the feedback week is pinned to one with comments for every class.
+
+DATA_10 = os.path.join(verify.UPLOADS, 'Grade_10_data.xlsx')
+DATA_11 = os.path.join(verify.UPLOADS, 'Grade_11_data.xlsx')
+TIMESHEET = os.path.join(verify.UPLOADS, 'PCT_Teacher_Timesheet_Responses.xlsx')
+
+
+@pytest.fixture(scope='module')
+def rendered(tmp_path_factory):
+    for path in (DATA_10, DATA_11, TIMESHEET):
+        if not os.path.exists(path):
+            pytest.skip(f'sample file missing: {path}')
+    feedback_by_class = timesheet.load_feedback_by_class(
+        TIMESHEET, report_grade_10.classes + report_grade_11.classes, now=verify.SAMPLE_WEEK_END)
+    out_dir = tmp_path_factory.mktemp('engines')
+    return {engine: verify.render_all(engine, os.path.join(out_dir, engine), DATA_10, DATA_11, feedback_by_class)
+            for engine in (report_render.ENGINE_DOCX, report_render.ENGINE_XML)}
+
+
+def document_xml(path):
+    with zipfile.ZipFile(path) as archive:
+        return archive.read('word/document.xml')
+
+
+def test_engines_render_every_class(rendered):
+    expected = {f'W21-PCT-Report-{class_name}.docx' for class_name in report_grade_10.classes + report_grade_11.classes}
+    for engine, files in rendered.items():
+        assert {os.path.basename(path) for path in files} == expected, engine
+
+
+def test_document_xml_identical(rendered):
+    xml_files = {os.path.basename(path): path for path in rendered[report_render.ENGINE_XML]}
+    differing = [os.path.basename(path) for path in rendered[report_render.ENGINE_DOCX]
+                 if document_xml(path) != document_xml(xml_files[os.path.basename(path)])]
+    assert differing == []
+
+
+def test_feedback_table_compared(rendered):
+    # Multi-line comments are where the XML engine writes w:br / w:tab
+    for path in rendered[report_render.ENGINE_DOCX]:
+        assert verify.feedback_rows(verify.extract(path)) > 0, os.path.basename(path)
@@ -0,0 +1,89 @@
+import os
+import re
+import math
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+import upload_cache
+
+# Teacher timesheet ("PCT Teacher Timesheet (Responses).xlsx") ingestion.
+# Parsed once per /generate request and shared by the Grade 10 and Grade 11 pipelines.
+
+FEEDBACK_COLUMNS = ['Date', 'Class', 'Your_name', 'Comments']
+
+
+def normalize_column(name):
+    """'Your name ' -> 'Your_name', 'Class (old)' -> 'Class_old' (same rule as the report modules)."""
+    return str(name).strip().replace('(', '').replace(')', '').replace(' ', '_')
+
+
+def feedback_window(now=None):
+    """Reporting window: the 7 days up to the most recent Sunday."""
+    if now is None:
+        now = datetime.today()
+    end = now - timedelta(days=now.isoweekday() % 7)
+    return end - timedelta(days=7), end
+
+
+def class_to_exponential(value):
+    """Undo Excel's number formatting of class names, e.g. '100' (from 10E1) -> '10E1'."""
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+        exponent = int(math.log10(abs(value)))
+        base = value / (10 ** exponent)
+        return f"{int(base*10)}E{exponent-1}"
+    return value
+
+
+def read_timesheet(path, now=None):
+    """
+    Reads the feedback columns of the timesheet and keeps only this week's rows.
+    The date filter runs on the parsed dates before any string conversion.
+    """
+    if path is None or not os.path.exists(path):
+        return pd.DataFrame(columns=FEEDBACK_COLUMNS)
+
+    feedback = pd.read_excel(path, usecols=lambda col: normalize_column(col) in FEEDBACK_COLUMNS)
+    feedback.columns = [normalize_column(col) for col in feedback.columns]
+    feedback = feedback[FEEDBACK_COLUMNS]
+
+    dates = pd.to_datetime(feedback['Date'], errors='coerce')
+    start, end = feedback_window(now)
+    in_window = (dates >= start) & (dates <= end)
+
+    feedback = feedback[in_window].astype(str)
+    feedback['Date'] = dates[in_window]
+    feedback['Class'] = feedback['Class'].str.upper().map(class_to_exponential)
+    return feedback
+
+
+def load_timesheet(path, now=None):
+    """read_timesheet, served from the upload cache when the same file was parsed for the same week."""
+    if path is None or not os.path.exists(path):
+        return read_timesheet(path, now=now)
+    start, _ = feedback_window(now)
+    kind = f"timesheet:{start:%Y-%m-%d}"
+    feedback = upload_cache.lookup(path, kind)
+    if feedback is None:
+        feedback = read_timesheet(path, now=now)
+        upload_cache.store(path, kind, feedback)
+    return feedback
+
+
+def partition_by_class(feedback, class_names):
+    """
+    {class_name: feedback rows whose Class contains class_name}, in timesheet order.
+    Uses the same regex search as Series.str.contains(class_name), but evaluates it once
+    per distinct Class value instead of once per row.
+    """
+    codes, uniques = pd.factorize(feedback['Class'])
+    by_class = {}
+    for class_name in class_names:
+        pattern = re.compile(class_name)
+        matching = [code for code, value in enumerate(uniques) if pattern.search(str(value))]
+        by_class[class_name] = feedback[np.isin(codes, matching)]
+    return by_class
+
+
+def load_feedback_by_class(path, class_names, now=None):
+    return partition_by_class(load_timesheet(path, now=now), class_names)
@@ -0,0 +1,133 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# Parsed uploads, keyed by the SHA-256 of the uploaded file. The UI usually re-submits the
+# same platform exports and timesheet with only the week numbers changed, so the cleaned
+# DataFrames (clean_data output, this week's timesheet rows) are kept in memory and an
+# identical file skips Excel parsing and cleaning. Entries are evicted least recently used
+# first once their in-memory size exceeds PCT_UPLOAD_CACHE_MB.
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = int(float(os.environ.get('PCT_UPLOAD_CACHE_MB', 128)) * 1024 * 1024)
+CHUNK_SIZE = 1024 * 1024
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # (sha256, kind) -> (DataFrame, size)
+_total_bytes = 0
+_digests = {}             # path -> ((mtime_ns, size), sha256), filled on upload or first lookup
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+MAX_DIGESTS = 256
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _remember(path, signature, digest):
+    with _lock:
+        if len(_digests) >= MAX_DIGESTS:
+            # Uploads live in per-request workspaces that are deleted after the run
+            for known_path in [known_path for known_path in _digests if not os.path.exists(known_path)]:
+                del _digests[known_path]
+        _digests[path] = (signature, digest)
+
+
+def save_upload(file_storage, path):
+    """Saves an uploaded file to path, hashing it on the way to disk. Returns the SHA-256."""
+    digest = hashlib.sha256()
+    with open(path, 'wb') as f:
+        for chunk in iter(lambda: file_storage.stream.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            f.write(chunk)
+    _remember(path, _signature(path), digest.hexdigest())
+    return digest.hexdigest()
+
+
+def content_hash(path):
+    signature = _signature(path)
+    with _lock:
+        known = _digests.get(path)
+    if known is not None and known[0] == signature:
+        return known[1]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    _remember(path, signature, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def _frame_size(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _drop(key):
+    global _total_bytes
+    _, size = _entries.pop(key)
+    _total_bytes -= size
+
+
+def _key(path, kind):
+    try:
+        return (content_hash(path), kind)
+    except OSError:
+        return None
+
+
+def lookup(path, kind):
+    """
+    A copy of the frame stored for this file's content under kind, or None.
+    kind names what was derived from the file, e.g. 'grade_10' or 'timesheet:2025-01-05'.
+    """
+    key = _key(path, kind)
+    if key is None:
+        return None
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            _stats['misses'] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats['hits'] += 1
+        df = entry[0]
+    # Callers add columns to what they get back, so the cached frame is never handed out
+    return df.copy()
+
+
+def store(path, kind, df):
+    """Caches a copy of df for this file's content under kind."""
+    global _total_bytes
+    key = _key(path, kind)
+    if key is None:
+        return
+    df = df.copy()
+    size = _frame_size(df)
+    if size > MAX_BYTES:
+        logger.info(f"Not caching {kind} for {os.path.basename(path)}: {size} bytes exceeds the cache size")
+        return
+    with _lock:
+        if key in _entries:
+            _drop(key)
+        _entries[key] = (df, size)
+        _total_bytes += size
+        while _total_bytes > MAX_BYTES:
+            _drop(next(iter(_entries)))
+            _stats['evictions'] += 1
+
+
+def clear():
+    global _total_bytes
+    with _lock:
+        _entries.clear()
+        _digests.clear()
+        _total_bytes = 0
+
+
+def stats():
+    with _lock:
+        return dict(_stats, entries=len(_entries), bytes=_total_bytes, max_bytes=MAX_BYTES)
@@ -0,0 +1,93 @@
+"""
+Renders the same reports with the python-docx engine and the direct-XML engine and
+diffs the extracted paragraph text and table contents of every pair of files.
+
+    python verify_render_engines.py [grade_10_export] [grade_11_export] [timesheet] [week_end YYYY-MM-DD]
+
+Defaults to the sample files in uploads/. The feedback week is pinned (SAMPLE_WEEK_END by
+default) so the teacher comments table, with its multi-line comments, is always compared.
+Exits with status 1 if any report differs or no report has feedback rows.
+tests/test_render_engines.py runs the same comparison under pytest (python -m pytest).
+"""
+import os
+import sys
+import difflib
+import tempfile
+from datetime import datetime
+from docx import Document
+import report_render
+import timesheet
+import report_grade_10
+import report_grade_11
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+UPLOADS = os.path.join(BASE_DIR, 'uploads')
+# A week of the sample timesheet with comments for every Grade 10 and Grade 11 class
+SAMPLE_WEEK_END = datetime(2026, 2, 1)
+FEEDBACK_TABLE = 3
+
+
+def extract(path):
+    doc = Document(path)
+    lines = [f'P: {paragraph.text}' for paragraph in doc.paragraphs]
+    for t, table in enumerate(doc.tables):
+        for r, row in enumerate(table.rows):
+            lines.append(f'T{t}R{r}: ' + ' | '.join(cell.text for cell in row.cells))
+    return lines
+
+
+def feedback_rows(lines):
+    """Rows of the teacher comments table below its header."""
+    return sum(1 for line in lines if line.startswith(f'T{FEEDBACK_TABLE}R')) - 1
+
+
+def render_all(engine, out_dir, data_10, data_11, feedback_by_class):
+    files_10, _ = report_grade_10.generate_grade_10_reports(
+        21, 20, 18, data_10, output_dir=os.path.join(out_dir, 'Grade_10'),
+        workers=1, feedback_by_class=feedback_by_class, engine=engine)
+    files_11, _ = report_grade_11.generate_grade_11_reports(
+        21, 20, 18, data_11, output_dir=os.path.join(out_dir, 'Grade_11'),
+        workers=1, feedback_by_class=feedback_by_class, engine=engine)
+    return files_10 + files_11
+
+
+def main(argv):
+    data_10 = argv[1] if len(argv) > 1 else os.path.join(UPLOADS, 'Grade_10_data.xlsx')
+    data_11 = argv[2] if len(argv) > 2 else os.path.join(UPLOADS, 'Grade_11_data.xlsx')
+    timesheet_path = argv[3] if len(argv) > 3 else os.path.join(UPLOADS, 'PCT_Teacher_Timesheet_Responses.xlsx')
+    week_end = datetime.strptime(argv[4], '%Y-%m-%d') if len(argv) > 4 else SAMPLE_WEEK_END
+
+    # Shared by both engines, like /generate does
+    feedback_by_class = timesheet.load_feedback_by_class(
+        timesheet_path, report_grade_10.classes + report_grade_11.classes, now=week_end)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docx_files = render_all(report_render.ENGINE_DOCX, os.path.join(tmp, 'docx'), data_10, data_11, feedback_by_class)
+        xml_files = render_all(report_render.ENGINE_XML, os.path.join(tmp, 'xml'), data_10, data_11, feedback_by_class)
+
+        if [os.path.basename(p) for p in docx_files] != [os.path.basename(p) for p in xml_files]:
+            print('Engines generated different report sets')
+            return 1
+
+        failed = 0
+        with_feedback = 0
+        for docx_path, xml_path in zip(docx_files, xml_files):
+            docx_lines = extract(docx_path)
+            if feedback_rows(docx_lines) > 0:
+                with_feedback += 1
+            diff = list(difflib.unified_diff(docx_lines, extract(xml_path),
+                                             'docx/' + os.path.basename(docx_path),
+                                             'xml/' + os.path.basename(xml_path), lineterm=''))
+            if diff:
+                failed += 1
+                print('\n'.join(diff))
+
+    print(f'{len(docx_files)} reports compared ({with_feedback} with teacher comments), {failed} differ')
+    if not with_feedback:
+        print(f'No report has teacher comments for the week ending {week_end:%Y-%m-%d}; table {FEEDBACK_TABLE} was not compared')
+        return 1
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,148 @@
+import os
+import time
+import uuid
+import shutil
+import logging
+import threading
+
+# Per-request workspaces for /generate. Each run saves its uploads and renders its reports
+# inside its own directory under WORKSPACE_DIR, so concurrent requests never overwrite each
+# other's files. A finished week directory is published by atomically pointing the public
+# path (Grade_10/Grade_10_Week N) at the workspace's copy through a symlink; readers see
+# either the previous complete week or the new one, never a half-written mix. Where
+# symlinks are unavailable the directories are swapped by rename instead.
+#
+# Workspaces older than PCT_WORKSPACE_TTL seconds are removed, unless a published week
+# directory still points into them.
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE_SECONDS = float(os.environ.get('PCT_WORKSPACE_TTL', 3600))
+UPLOADS = 'uploads'
+OUTPUTS = 'out'
+
+_cleanup_lock = threading.Lock()
+
+
+class Workspace:
+    def __init__(self, root):
+        self.id = f'{int(time.time())}-{uuid.uuid4().hex[:12]}'
+        self.path = os.path.join(root, self.id)
+        self.uploads = os.path.join(self.path, UPLOADS)
+        self.outputs = os.path.join(self.path, OUTPUTS)
+        os.makedirs(self.uploads)
+        os.makedirs(self.outputs)
+
+    def upload_path(self, field, filename):
+        # Prefixed with the form field, so two uploads with the same file name don't collide
+        return os.path.join(self.uploads, f'{field}-{filename}')
+
+    def stage(self, published_dir):
+        """
+        Private output directory for the week published at published_dir. It starts as a
+        copy of the published reports (mtimes preserved), so incremental runs can reuse them.
+        """
+        staging_dir = os.path.join(self.outputs, os.path.basename(published_dir))
+        os.makedirs(staging_dir, exist_ok=True)
+        if os.path.isdir(published_dir):
+            for name in os.listdir(published_dir):
+                source = os.path.join(published_dir, name)
+                if not os.path.isfile(source):
+                    continue
+                try:
+                    # Copies, not hard links: a re-rendered report must not write through to the published file
+                    shutil.copy2(source, os.path.join(staging_dir, name))
+                except FileNotFoundError:
+                    # Replaced by a concurrent publish; this run just renders it again
+                    pass
+        return staging_dir
+
+    def discard_uploads(self):
+        shutil.rmtree(self.uploads, ignore_errors=True)
+
+
+def _swap_directories(staging_dir, published_dir):
+    retired = f'{published_dir}.old-{uuid.uuid4().hex[:8]}'
+    if os.path.lexists(published_dir):
+        os.rename(published_dir, retired)
+    os.rename(staging_dir, published_dir)
+    if os.path.lexists(retired):
+        _remove(retired)
+
+
+def _remove(path):
+    if os.path.islink(path):
+        os.remove(path)
+    else:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def publish(staging_dir, published_dir):
+    """Makes staging_dir the content of published_dir in one step."""
+    link = f'{published_dir}.{uuid.uuid4().hex[:8]}.link'
+    try:
+        os.symlink(os.path.abspath(staging_dir), link, target_is_directory=True)
+    except (OSError, NotImplementedError) as e:
+        logger.info(f"Symlinks unavailable ({e}), publishing {published_dir} by rename")
+        _swap_directories(staging_dir, published_dir)
+        return
+
+    if os.path.isdir(published_dir) and not os.path.islink(published_dir):
+        # A plain directory from before workspaces existed; os.replace can't overwrite it
+        retired = f'{published_dir}.old-{uuid.uuid4().hex[:8]}'
+        os.rename(published_dir, retired)
+        os.replace(link, published_dir)
+        _remove(retired)
+    else:
+        os.replace(link, published_dir)
+
+
+def _published_targets(published_roots):
+    targets = set()
+    for root in published_roots:
+        if not os.path.isdir(root):
+            continue
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if os.path.islink(path):
+                targets.add(os.path.realpath(path))
+    return targets
+
+
+def cleanup(root, published_roots, max_age=None, now=None):
+    """Removes workspaces older than max_age that no published week directory points into."""
+    if max_age is None:
+        max_age = MAX_AGE_SECONDS
+    if now is None:
+        now = time.time()
+    if not os.path.isdir(root):
+        return []
+
+    removed = []
+    with _cleanup_lock:
+        in_use = _published_targets(published_roots)
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            try:
+                created = int(name.split('-', 1)[0])
+            except ValueError:
+                continue
+            if now - created <= max_age:
+                continue
+            real_path = os.path.realpath(path)
+            if any(target == real_path or target.startswith(real_path + os.sep) for target in in_use):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(name)
+    if removed:
+        logger.info(f"Removed {len(removed)} expired workspace(s) from {root}")
+    return removed
+
+
+def create(root, published_roots=()):
+    """New workspace under root; expired ones are cleaned up first."""
+    try:
+        cleanup(root, published_roots)
+    except OSError as e:
+        logger.warning(f"Workspace cleanup failed: {e}")
+    return Workspace(root)
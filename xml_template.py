@@ -0,0 +1,259 @@
+import os
+import copy
+import zipfile
+import threading
+from lxml import etree
+
+# Direct-XML render engine. The template .docx is read as a zip: word/document.xml is
+# parsed once with plain lxml and every other entry is kept as raw bytes. A report is a
+# deep copy of the document tree, filled in place, then streamed into a new zip next
+# to the untouched entries. No python-docx objects are created.
+#
+# The edits mirror what python-docx does for cell.text, paragraph.text, alignment,
+# Table.add_row() and font.name/size, so both engines produce equivalent documents.
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+XML_NS = 'http://www.w3.org/XML/1998/namespace'
+NSMAP = {'w': W_NS}
+DOCUMENT_PART = 'word/document.xml'
+
+# Schema order of <w:rPr> children, used to insert rFonts/sz where Word expects them
+RPR_SEQUENCE = ('rStyle', 'rFonts', 'b', 'bCs', 'i', 'iCs', 'caps', 'smallCaps', 'strike', 'dstrike',
+                'outline', 'shadow', 'emboss', 'imprint', 'noProof', 'snapToGrid', 'vanish', 'webHidden',
+                'color', 'spacing', 'w', 'kern', 'position', 'sz', 'szCs', 'highlight', 'u', 'effect',
+                'bdr', 'shd', 'fitText', 'vertAlign', 'rtl', 'cs', 'em', 'lang', 'eastAsianLayout',
+                'specVanish', 'oMath')
+
+_lock = threading.Lock()
+_templates = {}  # absolute path -> ((mtime_ns, size), [(ZipInfo, bytes)], document root)
+
+
+def w(tag):
+    return f'{{{W_NS}}}{tag}'
+
+
+def _compiled(path):
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = os.path.abspath(path)
+    with _lock:
+        entry = _templates.get(key)
+        if entry is None or entry[0] != signature:
+            with zipfile.ZipFile(path) as package:
+                entries = [(info, package.read(info.filename)) for info in package.infolist()]
+            document = dict((info.filename, data) for info, data in entries)[DOCUMENT_PART]
+            entry = (signature, entries, etree.fromstring(document))
+            _templates[key] = entry
+    return entry[1], entry[2]
+
+
+# --- Text -------------------------------------------------------------------------------
+
+def _set_run_text(r, text):
+    """Same markup as python-docx run.text: w:t chunks, w:tab for '\\t', w:br for '\\n'/'\\r'."""
+    buffer = []
+
+    def flush():
+        if buffer:
+            chunk = ''.join(buffer)
+            t = etree.SubElement(r, w('t'))
+            t.text = chunk
+            if len(chunk.strip()) < len(chunk):
+                t.set(f'{{{XML_NS}}}space', 'preserve')
+            buffer.clear()
+
+    for char in text:
+        if char == '\t':
+            flush()
+            etree.SubElement(r, w('tab'))
+        elif char in '\r\n':
+            flush()
+            etree.SubElement(r, w('br'))
+        else:
+            buffer.append(char)
+    flush()
+
+
+def _run_text(r):
+    parts = []
+    for child in r:
+        tag = etree.QName(child).localname
+        if tag == 't':
+            parts.append(child.text or '')
+        elif tag in ('tab', 'ptab'):
+            parts.append('\t')
+        elif tag == 'cr':
+            parts.append('\n')
+        elif tag == 'br':
+            parts.append('\n' if child.get(w('type'), 'textWrapping') == 'textWrapping' else '')
+        elif tag == 'noBreakHyphen':
+            parts.append('-')
+    return ''.join(parts)
+
+
+def paragraph_text(p):
+    """Text of a <w:p> as python-docx's paragraph.text reports it (runs and hyperlinks)."""
+    return ''.join(_run_text(r) for r in p.xpath('./w:r | ./w:hyperlink/w:r', namespaces=NSMAP))
+
+
+def _clear_except(element, keep):
+    for child in list(element):
+        if child.tag != w(keep):
+            element.remove(child)
+
+
+def set_paragraph_text(p, text):
+    """paragraph.text = text: one unformatted run, paragraph properties kept."""
+    _clear_except(p, 'pPr')
+    r = etree.SubElement(p, w('r'))
+    if text:
+        _set_run_text(r, text)
+
+
+def set_cell_text(tc, text):
+    """cell.text = text: a single paragraph with a single run, cell properties kept."""
+    _clear_except(tc, 'tcPr')
+    p = etree.SubElement(tc, w('p'))
+    _set_run_text(etree.SubElement(p, w('r')), text)
+
+
+def align_cell(tc, value):
+    """Sets <w:jc> on every paragraph of a cell just filled by set_cell_text()."""
+    for p in tc.findall(w('p')):
+        pPr = p.find(w('pPr'))
+        if pPr is None:
+            pPr = etree.Element(w('pPr'))
+            p.insert(0, pPr)
+        jc = pPr.find(w('jc'))
+        if jc is None:
+            jc = etree.SubElement(pPr, w('jc'))
+        jc.set(w('val'), value)
+
+
+# --- Tables -----------------------------------------------------------------------------
+
+def _grid_span(tc):
+    span = tc.find(f"{w('tcPr')}/{w('gridSpan')}")
+    return int(span.get(w('val'))) if span is not None else 1
+
+
+def _is_merge_continuation(tc):
+    merge = tc.find(f"{w('tcPr')}/{w('vMerge')}")
+    return merge is not None and merge.get(w('val'), 'continue') == 'continue'
+
+
+def _grid_before(tr):
+    before = tr.find(f"{w('trPr')}/{w('gridBefore')}")
+    return int(before.get(w('val'))) if before is not None else 0
+
+
+def _tc_at_offset(tr, offset):
+    position = _grid_before(tr)
+    for tc in tr.findall(w('tc')):
+        if position == offset:
+            return tc
+        position += _grid_span(tc)
+    raise ValueError(f'no cell at grid offset {offset}')
+
+
+def row_cells(tr):
+    """The cells python-docx's row.cells returns: spans repeated, merged continuations resolved upward."""
+    cells = []
+    offset = _grid_before(tr)
+    for tc in tr.findall(w('tc')):
+        origin, above = tc, tr
+        while _is_merge_continuation(origin):
+            above = above.getprevious()
+            while above is not None and above.tag != w('tr'):
+                above = above.getprevious()
+            origin = _tc_at_offset(above, offset)
+        span = _grid_span(tc)
+        cells.extend([origin] * span)
+        offset += span
+    return cells
+
+
+def _prototype_row(tbl, filled):
+    """The row Table.add_row() creates, with a paragraph and run in the first `filled` cells."""
+    tr = etree.Element(w('tr'), nsmap=NSMAP)
+    for index, gridCol in enumerate(tbl.findall(f"{w('tblGrid')}/{w('gridCol')}")):
+        tc = etree.SubElement(tr, w('tc'))
+        width = gridCol.get(w('w'))
+        if width is not None:
+            tcW = etree.SubElement(etree.SubElement(tc, w('tcPr')), w('tcW'))
+            tcW.set(w('type'), 'dxa')
+            tcW.set(w('w'), width)
+        p = etree.SubElement(tc, w('p'))
+        if index < filled:
+            etree.SubElement(p, w('r'))
+    return tr
+
+
+def add_rows(tbl, rows):
+    """Appends one row per sequence of cell texts (extra texts beyond the grid are ignored)."""
+    column_count = len(tbl.findall(f"{w('tblGrid')}/{w('gridCol')}"))
+    prototypes = {}
+    for texts in rows:
+        texts = list(texts)[:column_count]
+        prototype = prototypes.get(len(texts))
+        if prototype is None:
+            prototype = prototypes[len(texts)] = _prototype_row(tbl, len(texts))
+        tr = copy.deepcopy(prototype)
+        for r, text in zip(tr.iter(w('r')), texts):
+            _set_run_text(r, text)
+        tbl.append(tr)
+
+
+# --- Fonts ------------------------------------------------------------------------------
+
+def _get_or_insert(rPr, tag):
+    child = rPr.find(w(tag))
+    if child is not None:
+        return child
+    child = etree.Element(w(tag))
+    successors = {w(name) for name in RPR_SEQUENCE[RPR_SEQUENCE.index(tag) + 1:]}
+    for index, existing in enumerate(rPr):
+        if existing.tag in successors:
+            rPr.insert(index, child)
+            return child
+    rPr.append(child)
+    return child
+
+
+def set_run_fonts(root, xpath, name, half_points):
+    """Sets rFonts (ascii, hAnsi, eastAsia) and sz on every run matched by xpath."""
+    for r in root.xpath(xpath, namespaces=NSMAP):
+        rPr = r.find(w('rPr'))
+        if rPr is None:
+            rPr = etree.Element(w('rPr'))
+            r.insert(0, rPr)
+        rFonts = _get_or_insert(rPr, 'rFonts')
+        rFonts.set(w('ascii'), name)
+        rFonts.set(w('hAnsi'), name)
+        rFonts.set(w('eastAsia'), name)
+        _get_or_insert(rPr, 'sz').set(w('val'), str(half_points))
+
+
+# --- Package ----------------------------------------------------------------------------
+
+def open_template(path):
+    """Returns (entries, document root): the raw zip entries and a private copy of document.xml."""
+    entries, root = _compiled(path)
+    with _lock:
+        return entries, copy.deepcopy(root)
+
+
+def save(entries, root, file_path):
+    """Writes the package with the edited document.xml streamed in place of the template's."""
+    with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as package:
+        for info, data in entries:
+            if info.filename == DOCUMENT_PART:
+                with package.open(DOCUMENT_PART, 'w') as part:
+                    etree.ElementTree(root).write(part, xml_declaration=True, encoding='UTF-8', standalone=True)
+            else:
+                package.writestr(info, data)
+
+
+def clear():
+    with _lock:
+        _templates.clear()
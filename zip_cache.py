@@ -0,0 +1,136 @@
+import os
+import glob
+import shutil
+import hashlib
+import logging
+import zipfile
+import tempfile
+import private_tmp
+
+# ZIP downloads of a week's reports. The archive is streamed to the client while it is
+# built, with .docx entries stored as-is (they are already deflated zips), and a copy is
+# kept on disk per week directory. The cached copy is named after the directory's file
+# listing (names, sizes, mtimes), so any regenerated report invalidates it.
+# Cached archives are served as downloads, so the default directory is per user and only
+# used while it is private (see private_tmp).
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = private_tmp.user_temp_path('pct_zip_cache')
+CACHE_DIR = os.environ.get('PCT_ZIP_CACHE_DIR') or DEFAULT_CACHE_DIR
+CHUNK_SIZE = 256 * 1024
+STORED_EXTENSIONS = ('.docx', '.zip', '.xlsx')
+
+
+class _ChunkSink:
+    """Unseekable file object that hands zipfile's output back to the caller in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _cache_dir(create=False):
+    """CACHE_DIR, or None when it is the default per-user directory and not private."""
+    if CACHE_DIR != DEFAULT_CACHE_DIR:
+        if create:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+        return CACHE_DIR
+    return private_tmp.private_dir(CACHE_DIR, create)
+
+
+def _list_files(target_dir):
+    # Every report file, stored under its base name; dotfiles (the report manifest) are left out
+    files = []
+    for root, dirs, names in os.walk(target_dir):
+        for name in names:
+            if not name.startswith('.'):
+                files.append((os.path.join(root, name), name))
+    return files
+
+
+def _dir_key(target_dir):
+    return hashlib.sha1(os.path.abspath(target_dir).encode('utf-8')).hexdigest()[:16]
+
+
+def _archive_path(target_dir, files):
+    signature = hashlib.sha1()
+    for path, name in files:
+        stat = os.stat(path)
+        signature.update(f'{name}\0{stat.st_size}\0{stat.st_mtime_ns}\n'.encode('utf-8'))
+    return os.path.join(CACHE_DIR, f'{_dir_key(target_dir)}-{signature.hexdigest()[:16]}.zip')
+
+
+def cached_archive(target_dir):
+    """Path of an up-to-date cached archive for target_dir, or None."""
+    if _cache_dir() is None:
+        return None
+    path = _archive_path(target_dir, _list_files(target_dir))
+    return path if os.path.exists(path) else None
+
+
+def _publish(tmp_path, archive_path, target_dir):
+    os.replace(tmp_path, archive_path)
+    for stale in glob.glob(os.path.join(CACHE_DIR, f'{_dir_key(target_dir)}-*.zip')):
+        if stale != archive_path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def stream_archive(target_dir):
+    """
+    Yields the ZIP of target_dir chunk by chunk. Once the last chunk has been produced
+    the archive is published to the cache; an interrupted download leaves no cache entry.
+    """
+    files = _list_files(target_dir)
+    archive_path = _archive_path(target_dir, files)
+
+    cache = None
+    try:
+        if _cache_dir(create=True) is None:
+            raise OSError(f'{CACHE_DIR} is not private to this user')
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.part')
+        cache = os.fdopen(fd, 'wb')
+    except OSError as e:
+        logger.warning(f"ZIP cache unavailable ({e}), streaming without caching")
+
+    def emit(data):
+        if cache is not None:
+            cache.write(data)
+        return data
+
+    completed = False
+    try:
+        sink = _ChunkSink()
+        with zipfile.ZipFile(sink, 'w') as zf:
+            for path, name in files:
+                info = zipfile.ZipInfo.from_file(path, name)
+                if name.lower().endswith(STORED_EXTENSIONS):
+                    info.compress_type = zipfile.ZIP_STORED
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, 'rb') as src, zf.open(info, 'w') as dest:
+                    shutil.copyfileobj(src, dest, CHUNK_SIZE)
+                yield emit(sink.drain())
+        yield emit(sink.drain())
+        completed = True
+    finally:
+        if cache is not None:
+            cache.close()
+            if completed:
+                _publish(tmp_path, archive_path, target_dir)
+            else:
+                os.remove(tmp_path)